@@ -0,0 +1,108 @@
+"""
+Сессии и пользователь из кэша: SQL-запросы и время на запрос.
+
+Для news:detail и notes:list сравнивает сессии в базе и стандартный
+ModelBackend (режим db) с сессиями cached_db и CachedModelBackend
+(режим cache). Каждая пара проекта и режима запускается в отдельном
+процессе; кэш страниц заметок отключён.
+
+    python benchmarks/auth_cache.py --requests 2000
+"""
+import argparse
+import json
+import subprocess
+import sys
+import time
+
+from bootstrap import print_table, setup_django
+
+PROJECTS = {
+    'news:detail': ('ya_news', 'yanews.settings'),
+    'notes:list': ('ya_note', 'yanote.settings'),
+}
+
+
+def seed(route):
+    """Автор с данными для маршрута и адрес страницы."""
+    from django.contrib.auth import get_user_model
+
+    author = get_user_model().objects.create(username='bench')
+    if route == 'news:detail':
+        from news.models import Comment, News
+
+        news = News.objects.create(title='Новость', text='Текст новости.')
+        Comment.objects.bulk_create(
+            Comment(news=news, author=author, text=f'Комментарий {index}')
+            for index in range(20)
+        )
+        return author, f'/news/{news.pk}/'
+    from notes.models import Note
+
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст', slug=f'note-{index}',
+             author=author)
+        for index in range(20)
+    )
+    return author, '/notes/'
+
+
+def run_mode(route, mode, requests):
+    project, settings_module = PROJECTS[route]
+    overrides = {}
+    if mode == 'db':
+        overrides = {
+            'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+            'AUTHENTICATION_BACKENDS': [
+                'django.contrib.auth.backends.ModelBackend'
+            ],
+        }
+    setup_django(
+        project, settings_module, DEBUG=False, ALLOWED_HOSTS=['*'],
+        **overrides
+    )
+    from django.db import connection
+    from django.test import Client
+    from django.test.utils import CaptureQueriesContext
+
+    author, url = seed(route)
+    client = Client()
+    client.force_login(author)
+    client.get(url)
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        for _ in range(requests):
+            assert client.get(url).status_code == 200
+        elapsed = time.perf_counter() - start
+    print(json.dumps({
+        'route': route,
+        'mode': mode,
+        'queries_per_request': len(queries) / requests,
+        'ms_per_request': round(elapsed / requests * 1000, 3),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--route', choices=PROJECTS)
+    parser.add_argument('--mode', choices=('db', 'cache'))
+    args = parser.parse_args()
+    if args.route:
+        run_mode(args.route, args.mode, args.requests)
+        return
+    rows = []
+    for route in PROJECTS:
+        for mode in ('db', 'cache'):
+            output = subprocess.run(
+                [
+                    sys.executable, __file__, '--route', route,
+                    '--mode', mode, '--requests', str(args.requests),
+                ],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            rows.append(json.loads(output.splitlines()[-1]))
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
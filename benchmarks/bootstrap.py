@@ -0,0 +1,69 @@
+"""Общая часть бенчмарков: проект Django на временной базе SQLite."""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def setup_django(project, settings_module, database=None, **overrides):
+    """
+    Настраивает проект из каталога project на новой временной базе.
+
+    Значения overrides заменяют одноимённые настройки проекта.
+    Если передан файл database, проект работает с ним без миграций.
+    Возвращает путь к файлу базы данных.
+    """
+    sys.path.insert(0, str(ROOT / project))
+    os.environ['DJANGO_SETTINGS_MODULE'] = settings_module
+
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    for name, value in overrides.items():
+        setattr(settings, name, value)
+    migrate = database is None
+    if migrate:
+        database = Path(tempfile.mkdtemp()) / 'bench.sqlite3'
+    settings.DATABASES['default']['NAME'] = database
+    django.setup()
+    if migrate:
+        call_command('migrate', verbosity=0)
+    return database
+
+
+def percentile(values, percent):
+    """Перцентиль percent (0–100) списка values."""
+    values = sorted(values)
+    index = round(percent / 100 * (len(values) - 1))
+    return values[index]
+
+
+def summary(timings, elapsed):
+    """Запросы в секунду и перцентили задержки в миллисекундах."""
+    return {
+        'requests': len(timings),
+        'rps': round(len(timings) / elapsed, 1),
+        'p50_ms': round(percentile(timings, 50) * 1000, 2),
+        'p95_ms': round(percentile(timings, 95) * 1000, 2),
+        'p99_ms': round(percentile(timings, 99) * 1000, 2),
+    }
+
+
+def print_table(rows):
+    """Печатает список словарей одинаковой структуры таблицей."""
+    columns = list(rows[0])
+    widths = [
+        max(len(str(column)), *(len(str(row[column])) for row in rows))
+        for column in columns
+    ]
+    print('  '.join(
+        str(column).ljust(width) for column, width in zip(columns, widths)
+    ))
+    for row in rows:
+        print('  '.join(
+            str(row[column]).ljust(width)
+            for column, width in zip(columns, widths)
+        ))
@@ -0,0 +1,124 @@
+"""
+Задержка первых запросов к новому рабочему процессу.
+
+Для каждого проекта запускает свежие процессы: cold — приложение
+из get_wsgi_application() без прогрева, warm — из wsgi.py проекта,
+который вызывает warmup(). В каждом процессе замеряется загрузка
+приложения и по одному первому запросу к каждой странице.
+
+    python benchmarks/first_request.py --runs 5
+"""
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from io import BytesIO
+
+from bootstrap import print_table, setup_django
+
+PROJECTS = {
+    'ya_news': ('yanews', ['/', '/news/1/', '/auth/login/']),
+    'ya_note': ('yanote', ['/', '/auth/login/', '/auth/signup/']),
+}
+
+
+def prepare(project):
+    """База с миграциями и одной новостью; печатает путь к файлу."""
+    package, _ = PROJECTS[project]
+    database = setup_django(project, f'{package}.settings')
+    if project == 'ya_news':
+        from news.models import News
+
+        News.objects.create(title='Новость', text='Текст новости.')
+    print(database)
+
+
+def call(application, path):
+    """Один GET-запрос к приложению WSGI; время в миллисекундах."""
+    environ = {
+        'REQUEST_METHOD': 'GET',
+        'PATH_INFO': path,
+        'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'HTTP_HOST': 'localhost',
+        'wsgi.url_scheme': 'http',
+        'wsgi.input': BytesIO(),
+        'wsgi.errors': sys.stderr,
+    }
+    statuses = []
+    start = time.perf_counter()
+    body = application(
+        environ, lambda status, headers: statuses.append(status)
+    )
+    b''.join(body)
+    elapsed = (time.perf_counter() - start) * 1000
+    assert statuses[0].startswith('200'), f'{path}: {statuses[0]}'
+    return elapsed
+
+
+def run_mode(project, mode, database):
+    package, paths = PROJECTS[project]
+    start = time.perf_counter()
+    setup_django(project, f'{package}.settings', database=database)
+    if mode == 'warm':
+        application = __import__(
+            f'{package}.wsgi', fromlist=['application']
+        ).application
+    else:
+        from django.core.wsgi import get_wsgi_application
+
+        application = get_wsgi_application()
+    result = {'boot_ms': (time.perf_counter() - start) * 1000}
+    for path in paths:
+        result[path] = call(application, path)
+    print(json.dumps(result))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--project', choices=PROJECTS)
+    parser.add_argument('--mode', choices=('cold', 'warm', 'prepare'))
+    parser.add_argument('--database')
+    args = parser.parse_args()
+    if args.mode == 'prepare':
+        prepare(args.project)
+        return
+    if args.mode:
+        run_mode(args.project, args.mode, args.database)
+        return
+
+    def run(*arguments):
+        return subprocess.run(
+            [sys.executable, __file__, *arguments],
+            check=True, capture_output=True, text=True,
+        ).stdout.splitlines()[-1]
+
+    rows = []
+    for project in PROJECTS:
+        database = run('--project', project, '--mode', 'prepare')
+        for mode in ('cold', 'warm'):
+            results = [
+                json.loads(run(
+                    '--project', project, '--mode', mode,
+                    '--database', database,
+                ))
+                for _ in range(args.runs)
+            ]
+            for key in results[0]:
+                rows.append({
+                    'project': project,
+                    'mode': mode,
+                    'measure': key,
+                    'median_ms': round(statistics.median(
+                        result[key] for result in results
+                    ), 2),
+                })
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
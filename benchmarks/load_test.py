@@ -0,0 +1,364 @@
+"""
+Нагрузочный тест обоих проектов по HTTP с проверкой на регрессию.
+
+Каждый проект запускается в отдельном процессе на новой базе
+(многопоточный WSGI-сервер runserver, DEBUG = False) и наполняется
+данными. Затем все маршруты news.urls, notes.urls и входа пользователей
+(users) по очереди получают --requests запросов от --concurrency
+одновременных клиентов. Нагрузка повторяется --rounds раз, и для
+маршрута записываются p50/p95/p99 задержки и запросы в секунду
+лучшего по медиане повтора: так меньше влияют посторонние процессы.
+
+Результаты сравниваются с базовым файлом --baseline: задержка p50
+или p95 выше базовой больше чем на --threshold (доля) или число
+запросов в секунду ниже на ту же долю — регрессия, скрипт завершается
+с кодом 1.
+Разница задержки меньше MIN_DELTA_MS миллисекунды не считается.
+Базовый файл зависит от машины: создайте его там, где запускаете
+проверку, флагом --update-baseline (или первым запуском без файла).
+Файл хранит параметры нагрузки; с другими параметрами сравнение
+не выполняется.
+
+    python benchmarks/load_test.py --update-baseline
+    python benchmarks/load_test.py --threshold 0.3
+"""
+import argparse
+import http.client
+import itertools
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, urlencode
+
+from bootstrap import print_table, setup_django, summary
+
+PROJECTS = {
+    'ya_news': ('yanews.settings', 'news'),
+    'ya_note': ('yanote.settings', 'notes'),
+}
+BASELINE = Path(__file__).resolve().parent / 'load_baseline.json'
+# p99 записывается в базовый файл, но слишком шумный для проверки.
+CHECKED_LATENCIES = ('p50_ms', 'p95_ms')
+MIN_DELTA_MS = 1
+# Любое значение из 32 букв подходит: проверяется совпадение
+# cookie csrftoken и заголовка X-CSRFToken.
+CSRF_TOKEN = 'loadtestloadtestloadtestloadtest'
+
+
+def plan_request(route, method, path, data=None, status=200, auth=True,
+                 json_body=False):
+    """
+    Запрос к маршруту route.
+
+    В строковых значениях data подстрока {n} заменяется номером
+    запроса, чтобы создаваемые объекты не совпадали.
+    """
+    return {
+        'route': route,
+        'method': method,
+        'path': path,
+        'data': data,
+        'json': json_body,
+        'status': status,
+        'auth': auth,
+    }
+
+
+def seed_news(author):
+    from django.conf import settings
+
+    from news.models import Comment, News
+
+    news = News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости.')
+        for index in range(settings.NEWS_COUNT_ON_HOME_PAGE * 2)
+    )[0]
+    comments = Comment.objects.bulk_create(
+        Comment(news=news, author=author, text=f'Комментарий {index}')
+        for index in range(settings.COMMENTS_COUNT_ON_PAGE)
+    )
+    detail = f'/news/{news.pk}/'
+    edit = f'/edit_comment/{comments[0].pk}/'
+    return [
+        plan_request('news:home', 'GET', '/', auth=False),
+        plan_request('news:detail', 'GET', detail, auth=False),
+        plan_request('news:detail', 'POST', detail,
+                     {'text': 'Комментарий {n}'}, status=302),
+        plan_request('news:edit', 'GET', edit),
+        plan_request('news:edit', 'POST', edit,
+                     {'text': 'Комментарий'}, status=302),
+        plan_request('news:delete', 'GET',
+                     f'/delete_comment/{comments[1].pk}/'),
+    ]
+
+
+def seed_notes(author):
+    from notes.models import Note
+
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text=f'Текст заметки {index}.',
+             slug=f'note-{index}', author=author)
+        for index in range(200)
+    )
+    # bulk_create не сохраняет версий; версия 1 — для возврата к ней.
+    Note.objects.get(slug='note-0').save()
+    slugs = [f'note-{index}' for index in range(1, 11)]
+    return [
+        plan_request('notes:home', 'GET', '/', auth=False),
+        plan_request('notes:list', 'GET', '/notes/'),
+        plan_request('notes:detail', 'GET', '/note/note-0/'),
+        plan_request('notes:add', 'GET', '/add/'),
+        plan_request('notes:add', 'POST', '/add/',
+                     {'title': 'Нагрузка {n}', 'text': 'Текст', 'slug': ''},
+                     status=302),
+        plan_request('notes:edit', 'GET', '/edit/note-0/'),
+        plan_request('notes:edit', 'POST', '/edit/note-0/',
+                     {'title': 'Заметка 0', 'text': 'Текст заметки 0.',
+                      'slug': 'note-0'}, status=302),
+        plan_request('notes:delete', 'GET', '/delete/note-0/'),
+        plan_request('notes:history', 'GET', '/history/note-0/'),
+        plan_request('notes:restore', 'POST', '/restore/note-0/1/',
+                     status=302),
+        plan_request('notes:search', 'GET', '/search/?q=' + quote('заметки')),
+        plan_request('notes:export', 'GET', '/export/?format=ndjson'),
+        plan_request('notes:success', 'GET', '/done/'),
+        plan_request('notes:api_list', 'GET', '/api/notes/'),
+        plan_request('notes:api_detail', 'GET', '/api/notes/note-0/'),
+        plan_request('notes:api_bulk_update', 'POST', '/api/bulk/update/',
+                     {'slugs': slugs, 'title': 'Заметка'},
+                     json_body=True),
+        plan_request('notes:api_bulk_delete', 'POST', '/api/bulk/delete/',
+                     {'slugs': ['missing']}, json_body=True),
+    ]
+
+
+def users_plan():
+    return [
+        plan_request('users:login', 'GET', '/auth/login/', auth=False),
+        plan_request('users:signup', 'GET', '/auth/signup/', auth=False),
+        plan_request('users:logout', 'POST', '/auth/logout/', auth=False),
+    ]
+
+
+def route_names(namespaces):
+    """Имена всех маршрутов пространств имён namespaces."""
+    from django.urls import get_resolver
+
+    return sorted(
+        f'{resolver.namespace}:{pattern.name}'
+        for resolver in get_resolver().url_patterns
+        if getattr(resolver, 'namespace', None) in namespaces
+        for pattern in resolver.url_patterns
+    )
+
+
+def serve(project):
+    """
+    Запускает проект и печатает одной строкой JSON порт, сессию
+    и план запросов; затем обслуживает запросы до завершения процесса.
+    """
+    settings_module, app = PROJECTS[project]
+    setup_django(
+        project, settings_module, DEBUG=False, ALLOWED_HOSTS=['*'],
+        QUERY_BUDGET_STRICT=False,
+    )
+    from django.contrib.auth import get_user_model
+    from django.core.servers.basehttp import (
+        ThreadedWSGIServer, WSGIRequestHandler
+    )
+    from django.core.wsgi import get_wsgi_application
+    from django.test import Client
+
+    class QuietHandler(WSGIRequestHandler):
+        def log_message(self, format, *args):
+            pass
+
+    author = get_user_model().objects.create(username='bench')
+    seed = seed_news if app == 'news' else seed_notes
+    plan = seed(author) + users_plan()
+    client = Client()
+    client.force_login(author)
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietHandler)
+    server.set_app(get_wsgi_application())
+    print(json.dumps({
+        'port': server.server_address[1],
+        'session': client.cookies['sessionid'].value,
+        'routes': route_names({app, 'users'}),
+        'plan': plan,
+    }), flush=True)
+    server.serve_forever()
+
+
+def fill(value, number):
+    if isinstance(value, str):
+        return value.replace('{n}', str(number))
+    if isinstance(value, dict):
+        return {key: fill(item, number) for key, item in value.items()}
+    return value
+
+
+def send(port, session, request, number):
+    """Выполняет запрос плана; возвращает время ответа и код статуса."""
+    cookies = f'csrftoken={CSRF_TOKEN}'
+    if request['auth']:
+        cookies += f'; sessionid={session}'
+    headers = {'Cookie': cookies, 'Connection': 'close'}
+    body = None
+    if request['data'] is not None:
+        data = fill(request['data'], number)
+        if request['json']:
+            body = json.dumps(data)
+            headers['Content-Type'] = 'application/json'
+        else:
+            body = urlencode(data)
+            headers['Content-Type'] = 'application/x-www-form-urlencoded'
+    if request['method'] == 'POST':
+        headers['X-CSRFToken'] = CSRF_TOKEN
+    start = time.perf_counter()
+    connection = http.client.HTTPConnection('127.0.0.1', port)
+    try:
+        connection.request(
+            request['method'], request['path'], body=body, headers=headers
+        )
+        response = connection.getresponse()
+        response.read()
+    finally:
+        connection.close()
+    return time.perf_counter() - start, response.status
+
+
+def load(port, session, request, requests, concurrency, numbers):
+    """Нагрузка на один запрос плана; сводка и число ошибок."""
+    def worker(_):
+        return send(port, session, request, next(numbers))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as executor:
+        results = list(executor.map(worker, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        **summary([timing for timing, _ in results], elapsed),
+        'errors': sum(status != request['status'] for _, status in results),
+    }
+
+
+def run_project(project, requests, concurrency, warmup, rounds):
+    process = subprocess.Popen(
+        [sys.executable, __file__, '--serve', project],
+        stdout=subprocess.PIPE, text=True,
+    )
+    try:
+        ready = json.loads(process.stdout.readline())
+        covered = {request['route'] for request in ready['plan']}
+        missing = sorted(set(ready['routes']) - covered)
+        if missing:
+            sys.exit(f'Нет запросов к маршрутам: {", ".join(missing)}')
+        numbers = itertools.count()
+        results = {}
+        for request in ready['plan']:
+            name = f'{request["route"]} {request["method"]}'
+            load(
+                ready['port'], ready['session'], request,
+                warmup, concurrency, numbers
+            )
+            results[name] = min(
+                (
+                    load(
+                        ready['port'], ready['session'], request,
+                        requests, concurrency, numbers
+                    )
+                    for _ in range(rounds)
+                ),
+                key=lambda result: result['p50_ms'],
+            )
+        return results
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def regressions(results, baseline, threshold):
+    """Описания регрессий results относительно baseline."""
+    found = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for metric in CHECKED_LATENCIES:
+            limit = max(
+                base[metric] * (1 + threshold), base[metric] + MIN_DELTA_MS
+            )
+            if result[metric] > limit:
+                found.append(
+                    f'{name}: {metric} {result[metric]} > {limit:.2f}'
+                )
+        if result['rps'] < base['rps'] * (1 - threshold):
+            found.append(
+                f'{name}: rps {result["rps"]} < '
+                f'{base["rps"] * (1 - threshold):.1f}'
+            )
+    return found
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawTextHelpFormatter
+    )
+    parser.add_argument('--requests', type=int, default=300)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--threshold', type=float, default=0.3)
+    parser.add_argument('--baseline', type=Path, default=BASELINE)
+    parser.add_argument('--update-baseline', action='store_true')
+    parser.add_argument('--project', choices=PROJECTS, action='append')
+    parser.add_argument('--serve', choices=PROJECTS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve)
+        return
+    parameters = {
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'warmup': args.warmup,
+        'rounds': args.rounds,
+    }
+    baseline = None
+    if not args.update_baseline and args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        if baseline.get('parameters') != parameters:
+            sys.exit(
+                f'Базовый файл снят с параметрами '
+                f'{baseline.get("parameters")}, а не {parameters}: '
+                f'запустите с ними или обновите его --update-baseline.'
+            )
+    results = {}
+    for project in args.project or PROJECTS:
+        results.update(run_project(
+            project, args.requests, args.concurrency, args.warmup,
+            args.rounds,
+        ))
+    print_table([
+        {'route': name, **result} for name, result in results.items()
+    ])
+    errors = [name for name, result in results.items() if result['errors']]
+    if errors:
+        sys.exit(f'Неожиданные коды ответа: {", ".join(errors)}')
+    if baseline is None:
+        args.baseline.write_text(json.dumps(
+            {'parameters': parameters, 'results': results}, indent=2
+        ) + '\n')
+        print(f'Базовые значения записаны в {args.baseline}')
+        return
+    found = regressions(results, baseline['results'], args.threshold)
+    if found:
+        print('\n'.join(found))
+        sys.exit(1)
+    print('Регрессий нет.')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+"""
+Синхронные и асинхронные страницы YaNews под ASGI.
+
+Каждый режим запускается в отдельном процессе: приложение ASGI
+вызывается напрямую, без сетевого сервера, с заданным числом
+одновременных запросов к главной странице и страницам новостей.
+
+    python benchmarks/news_async_views.py --concurrency 200 --requests 4000
+"""
+import argparse
+import asyncio
+import json
+import subprocess
+import sys
+import time
+
+from bootstrap import print_table, setup_django, summary
+
+NEWS_COUNT = 50
+COMMENTS_PER_NEWS = 100
+
+
+def seed():
+    from django.contrib.auth import get_user_model
+    from django.core.management import call_command
+
+    from news.models import Comment, News
+
+    author = get_user_model().objects.create(username='bench')
+    news = News.objects.bulk_create(
+        News(title=f'Новость {index}', text='Текст новости.')
+        for index in range(NEWS_COUNT)
+    )
+    Comment.objects.bulk_create(
+        Comment(news=item, author=author, text=f'Комментарий {index}')
+        for item in news
+        for index in range(COMMENTS_PER_NEWS)
+    )
+    call_command('recount_comments', verbosity=0, stdout=sys.stderr)
+    return [f'/news/{item.pk}/' for item in news]
+
+
+async def call(application, path):
+    """Один GET-запрос к приложению ASGI. Возвращает время и статус."""
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 50000),
+    }
+    request_sent = False
+    status = None
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    start = time.perf_counter()
+    await application(scope, receive, send)
+    return time.perf_counter() - start, status
+
+
+async def load(application, paths, concurrency, requests):
+    semaphore = asyncio.Semaphore(concurrency)
+    timings = []
+
+    async def worker(path):
+        async with semaphore:
+            elapsed, status = await call(application, path)
+            assert status == 200, f'{path}: {status}'
+            timings.append(elapsed)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        worker(paths[index % len(paths)]) for index in range(requests)
+    ))
+    return summary(timings, time.perf_counter() - start)
+
+
+def run_mode(mode, concurrency, requests):
+    setup_django(
+        'ya_news',
+        'yanews.settings',
+        DEBUG=False,
+        DEBUG_PROPAGATE_EXCEPTIONS=True,
+        NEWS_ASYNC_VIEWS=mode == 'async',
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }},
+    )
+    from django.core.asgi import get_asgi_application
+
+    paths = ['/', *seed()]
+    application = get_asgi_application()
+    result = asyncio.run(load(application, paths, concurrency, requests))
+    print(json.dumps({'mode': mode, 'concurrency': concurrency, **result}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=200)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--mode', choices=('sync', 'async'))
+    args = parser.parse_args()
+    if args.mode:
+        run_mode(args.mode, args.concurrency, args.requests)
+        return
+    rows = []
+    for mode in ('sync', 'async'):
+        output = subprocess.run(
+            [
+                sys.executable, __file__, '--mode', mode,
+                '--concurrency', str(args.concurrency),
+                '--requests', str(args.requests),
+            ],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(output.splitlines()[-1]))
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Проверка комментария на запрещённые слова: цикл и общее выражение.
+
+Сравнивает прежний цикл ``word in text`` по списку слов с
+BadWordsMatcher на списках разного размера и длинном комментарии
+без запрещённых слов (худший случай для обоих способов).
+
+    python benchmarks/news_bad_words.py
+"""
+import argparse
+import random
+import sys
+import timeit
+
+from bootstrap import ROOT, print_table
+
+sys.path.insert(0, str(ROOT / 'ya_news'))
+
+from news.moderation import BadWordsMatcher  # noqa: E402
+
+ALPHABET = 'абвгдежзийклмнопрстуфхцчшщыэюя'
+
+
+def random_word(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+
+def loop_search(words, text):
+    lowered_text = text.lower()
+    for word in words:
+        if word in lowered_text:
+            return word
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--text-length', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(0)
+    text = ' '.join(
+        random_word(rng, rng.randint(3, 9)) for _ in range(args.text_length)
+    )[:args.text_length]
+    rows = []
+    for size in (2, 100, 1000, 5000):
+        words = [
+            word for word in (
+                random_word(rng, rng.randint(7, 12)) for _ in range(size)
+            )
+            if word not in text
+        ]
+        start = timeit.default_timer()
+        matcher = BadWordsMatcher(words)
+        compile_ms = (timeit.default_timer() - start) * 1000
+        assert matcher.search(text) is None
+        loop = timeit.timeit(
+            lambda: loop_search(words, text), number=args.repeat
+        )
+        compiled = timeit.timeit(
+            lambda: matcher.search(text), number=args.repeat
+        )
+        rows.append({
+            'words': len(words),
+            'loop_ms': round(loop / args.repeat * 1000, 3),
+            'matcher_ms': round(compiled / args.repeat * 1000, 3),
+            'compile_ms': round(compile_ms, 1),
+        })
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
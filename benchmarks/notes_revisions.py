@@ -0,0 +1,76 @@
+"""
+История заметок: объём хранения и время восстановления версии.
+
+Сохраняет заметку из --lines строк, затем --edits правок по
+несколько строк и для разных NOTES_REVISION_SNAPSHOT_EVERY
+сравнивает объём истории с полными копиями текста и время
+восстановления самой дальней от полного текста версии.
+every=1 — полная копия на каждую версию.
+
+    python benchmarks/notes_revisions.py
+"""
+import argparse
+import json
+import random
+import timeit
+
+from bootstrap import print_table, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--lines', type=int, default=2000)
+    parser.add_argument('--edits', type=int, default=200)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    setup_django('ya_note', 'yanote.settings')
+
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+
+    from notes.models import Note
+    from notes.revisions import reconstruct
+
+    author = get_user_model().objects.create(username='author')
+    rng = random.Random(0)
+    base = [f'Строка {index} ' + 'текст ' * 8 + '\n'
+            for index in range(args.lines)]
+    texts = [''.join(base)]
+    for edit in range(args.edits):
+        lines = texts[-1].splitlines(keepends=True)
+        for index in rng.sample(range(len(lines)), 3):
+            lines[index] = f'Правка {edit}\n'
+        texts.append(''.join(lines))
+    full_copies = sum(len(text.encode()) for text in texts)
+
+    rows = []
+    for every in (1, 10, 50, 200):
+        settings.NOTES_REVISION_SNAPSHOT_EVERY = every
+        note = Note.objects.create(
+            title='Заметка', text=texts[0], slug=f'note-{every}',
+            author=author
+        )
+        for text in texts[1:]:
+            note.text = text
+            note.save()
+        stored = sum(
+            len((revision.snapshot or '').encode())
+            + len(json.dumps(revision.diff, ensure_ascii=False).encode())
+            for revision in note.revisions.all()
+        )
+        worst = min(every, len(texts))
+        assert reconstruct(note.pk, worst)['text'] == texts[worst - 1]
+        elapsed = timeit.timeit(
+            lambda: reconstruct(note.pk, worst), number=args.repeat
+        )
+        rows.append({
+            'every': every,
+            'stored_kb': round(stored / 1024),
+            'full_copies_kb': round(full_copies / 1024),
+            'reconstruct_ms': round(elapsed / args.repeat * 1000, 2),
+        })
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Поиск по заметкам: FTS5 против icontains.
+
+Заполняет временную базу заметками одного автора и сравнивает
+время поиска слова индексом notes_note_fts (первая страница
+по bm25 и число совпадений) с фильтром title/text__icontains.
+
+    python benchmarks/notes_search.py --notes 1000000
+"""
+import argparse
+import random
+import timeit
+
+from bootstrap import print_table, setup_django
+
+WORDS = (
+    'молоко хлеб встреча отчёт звонок билет врач подарок ремонт книга '
+    'поездка оплата письмо задача проект отпуск'
+).split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--notes', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    setup_django('ya_note', 'yanote.settings')
+
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+    from django.db.models import Q
+
+    from notes.models import Note
+    from notes.search import NoteSearchResults
+
+    author = get_user_model().objects.create(username='author')
+    rng = random.Random(0)
+    with transaction.atomic():
+        Note.objects.bulk_create(
+            (
+                Note(
+                    title=' '.join(rng.sample(WORDS, 2)),
+                    text=' '.join(rng.choices(WORDS, k=20)),
+                    slug=f'note-{index}',
+                    author=author,
+                )
+                for index in range(args.notes)
+            ),
+            batch_size=5000,
+        )
+
+    def fts(word):
+        results = NoteSearchResults(author, word)
+        return results.count(), list(results[0:50])
+
+    def icontains(word):
+        notes = Note.objects.filter(author=author).filter(
+            Q(title__icontains=word) | Q(text__icontains=word)
+        )
+        return notes.count(), list(notes.order_by('id')[:50])
+
+    rows = []
+    for word in ('молоко', 'отпуск', 'несуществующее'):
+        row = {'word': word, 'found': fts(word)[0]}
+        for name, search in (('fts_ms', fts), ('icontains_ms', icontains)):
+            elapsed = timeit.timeit(lambda: search(word), number=args.repeat)
+            row[name] = round(elapsed / args.repeat * 1000, 2)
+        rows.append(row)
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,120 @@
+"""
+SQLite под одновременными запросами: настройки по умолчанию и рабочие.
+
+Каждый профиль запускается в отдельном процессе на новой базе
+в файле. Потоки с тестовыми клиентами Django открывают список
+заметок и заметку и создают новые заметки (--writes — доля записи).
+Профиль default — sqlite3 без OPTIONS и с CONN_MAX_AGE = 0,
+profile production — DATABASES из yanote/settings.py.
+
+    python benchmarks/sqlite_concurrency.py --threads 16 --requests 4000
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bootstrap import print_table, setup_django, summary
+
+NOTES_PER_USER = 200
+
+
+def run_profile(profile, threads, requests, writes):
+    overrides = {}
+    if profile == 'default':
+        overrides['DATABASES'] = {'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+        }}
+    setup_django(
+        'ya_note',
+        'yanote.settings',
+        DEBUG=False,
+        CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache'
+        }},
+        **overrides,
+    )
+    from django.contrib.auth import get_user_model
+    from django.test import Client
+
+    from notes.models import Note
+
+    users = get_user_model().objects.bulk_create(
+        get_user_model()(username=f'user-{index}') for index in range(threads)
+    )
+    Note.objects.bulk_create(
+        Note(title=f'Заметка {index}', text='Текст заметки.',
+             slug=f'note-{user.pk}-{index}', author=user)
+        for user in users
+        for index in range(NOTES_PER_USER)
+    )
+
+    def worker(user):
+        client = Client(raise_request_exception=False)
+        client.force_login(user)
+        rng = random.Random(user.pk)
+        timings = []
+        errors = 0
+        for _ in range(requests // threads):
+            start = time.perf_counter()
+            if rng.random() < writes:
+                # Заголовки разных потоков не совпадают, чтобы потоки
+                # не соревновались за один slug.
+                response = client.post('/add/', {
+                    'title': f'Заметка {user.username}',
+                    'text': 'Текст',
+                    'slug': '',
+                })
+                ok = response.status_code == 302
+            else:
+                path = rng.choice((
+                    '/notes/',
+                    f'/note/note-{user.pk}-{rng.randrange(NOTES_PER_USER)}/',
+                ))
+                ok = client.get(path).status_code == 200
+            timings.append(time.perf_counter() - start)
+            errors += not ok
+        return timings, errors
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        results = list(executor.map(worker, users))
+    elapsed = time.perf_counter() - start
+    timings = [timing for result in results for timing in result[0]]
+    print(json.dumps({
+        'profile': profile,
+        **summary(timings, elapsed),
+        'errors': sum(result[1] for result in results),
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--writes', type=float, default=0.2)
+    parser.add_argument('--profile', choices=('default', 'production'))
+    args = parser.parse_args()
+    if args.profile:
+        run_profile(args.profile, args.threads, args.requests, args.writes)
+        return
+    rows = []
+    for profile in ('default', 'production'):
+        output = subprocess.run(
+            [
+                sys.executable, __file__, '--profile', profile,
+                '--threads', str(args.threads),
+                '--requests', str(args.requests),
+                '--writes', str(args.writes),
+            ],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        rows.append(json.loads(output.splitlines()[-1]))
+    print_table(rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import aget_object_or_404, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views import generic
+
+from .cache import aget_changed_at, aget_generation, page_cache_key
+from .forms import CommentForm
+from .metrics import count_cache
+from .models import News
+from .views import NewsComment, NewsDetail, NewsList
+
+
+class AsyncNewsPage(generic.View):
+    """
+    Базовый класс асинхронных страниц новостей.
+
+    Повторяет поведение синхронных представлений: условный GET
+    и кэш страниц для анонимных пользователей. Данные читаются
+    асинхронным ORM, шаблон рендерится без обращений к базе.
+    Подклассы задают template_name и async get_context_data(**kwargs).
+    """
+    template_name = None
+
+    async def render_page(self, request, **kwargs):
+        context = await self.get_context_data(**kwargs)
+        return render(request, self.template_name, context)
+
+    async def get(self, request, *args, **kwargs):
+        # Пользователь загружается заранее, чтобы шаблон не обращался
+        # к базе из асинхронного кода.
+        request.user = await request.auser()
+        generation = await aget_generation()
+        if request.user.is_authenticated or generation is None:
+            return await self.render_page(request, **kwargs)
+        etag = f'"{generation}"'
+        last_modified = int((await aget_changed_at()).timestamp())
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            key = page_cache_key(request, generation)
+            content = await cache.aget(key)
+            count_cache('news_page', content is not None)
+            if content is not None:
+                response = HttpResponse(content)
+            else:
+                response = await self.render_page(request, **kwargs)
+                if response.status_code == 200:
+                    await cache.aset(
+                        key,
+                        response.content,
+                        settings.NEWS_PAGE_CACHE_TIMEOUT
+                    )
+        response.headers.setdefault('ETag', etag)
+        response.headers.setdefault('Last-Modified', http_date(last_modified))
+        return response
+
+
+class AsyncNewsList(AsyncNewsPage):
+    """Список новостей."""
+    template_name = 'news/home.html'
+
+    async def get_context_data(self, **kwargs):
+        paginator = NewsList().get_keyset_paginator()
+        page = paginator.get_page(self.request.GET.get('cursor'))
+        object_list = [news async for news in page]
+        return {
+            'object_list': object_list,
+            'news_list': object_list,
+            'next_cursor': await paginator.aget_next_cursor(object_list),
+        }
+
+
+class AsyncNewsDetail(AsyncNewsPage):
+    """Новость с первой страницей комментариев."""
+    template_name = 'news/detail.html'
+
+    async def get_context_data(self, **kwargs):
+        news = await aget_object_or_404(News, pk=kwargs['pk'])
+        paginator = NewsDetail(object=news).get_keyset_paginator()
+        page = paginator.get_page(self.request.GET.get('cursor'))
+        comments = [comment async for comment in page]
+        context = {
+            'object': news,
+            'news': news,
+            'comments': comments,
+            'next_cursor': await paginator.aget_next_cursor(comments),
+        }
+        if self.request.user.is_authenticated:
+            context['form'] = CommentForm()
+        return context
+
+    async def post(self, request, *args, **kwargs):
+        view = sync_to_async(NewsComment.as_view())
+        return await view(request, *args, **kwargs)
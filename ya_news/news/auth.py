@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+from .metrics import count_cache
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend, который ищет пользователя сессии сначала в кэше.
+
+    Запись сбрасывается сигналами при сохранении и удалении
+    пользователя, в том числе при входе (обновляется last_login)
+    и смене пароля.
+    """
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        count_cache('auth_user', user is not None)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                cache.set(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = await cache.aget(key)
+        count_cache('auth_user', user is not None)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is not None:
+                await cache.aset(key, user, settings.AUTH_USER_CACHE_TIMEOUT)
+        return user
@@ -0,0 +1,123 @@
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils import timezone
+
+from .metrics import count_cache
+
+GENERATION_KEY = 'news:generation'
+CHANGED_AT_KEY = 'news:changed_at'
+
+
+def get_generation():
+    """
+    Текущее поколение данных новостей.
+
+    Начальное значение берётся из текущего времени, чтобы после
+    вытеснения ключа из кэша поколения не совпали со старыми.
+    None, если кэш не хранит значения (DummyCache).
+    """
+    generation = cache.get(GENERATION_KEY)
+    if generation is None:
+        cache.add(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(GENERATION_KEY)
+    return generation
+
+
+async def aget_generation():
+    """Асинхронный вариант get_generation."""
+    generation = await cache.aget(GENERATION_KEY)
+    if generation is None:
+        await cache.aadd(GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = await cache.aget(GENERATION_KEY)
+    return generation
+
+
+def get_changed_at():
+    """
+    Время начала текущего поколения.
+
+    Если ключ вытеснен из кэша, считаем, что данные изменились сейчас.
+    """
+    changed_at = cache.get(CHANGED_AT_KEY)
+    if changed_at is None:
+        cache.add(CHANGED_AT_KEY, timezone.now(), timeout=None)
+        changed_at = cache.get(CHANGED_AT_KEY)
+    return changed_at
+
+
+async def aget_changed_at():
+    """Асинхронный вариант get_changed_at."""
+    changed_at = await cache.aget(CHANGED_AT_KEY)
+    if changed_at is None:
+        await cache.aadd(CHANGED_AT_KEY, timezone.now(), timeout=None)
+        changed_at = await cache.aget(CHANGED_AT_KEY)
+    return changed_at
+
+
+def bump_generation():
+    """
+    Начинаем новое поколение: все закэшированные страницы устаревают.
+
+    Новое значение записывается целиком, а не через incr: в файловом
+    кэше incr — это чтение и запись, и одновременные сдвиги из разных
+    процессов дали бы одно и то же поколение.
+    """
+    cache.set(CHANGED_AT_KEY, timezone.now(), timeout=None)
+    cache.set(GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def page_etag(request, *args, **kwargs):
+    """Значение ETag страницы для анонимного пользователя."""
+    if request.user.is_authenticated:
+        return None
+    generation = get_generation()
+    if generation is None:
+        return None
+    return f'"{generation}"'
+
+
+def page_last_modified(request, *args, **kwargs):
+    """Last-Modified страницы для анонимного пользователя."""
+    if request.user.is_authenticated:
+        return None
+    return get_changed_at()
+
+
+def page_cache_key(request, generation):
+    path = md5(request.get_full_path().encode()).hexdigest()
+    return f'news:page:{generation}:{path}'
+
+
+class AnonymousPageCacheMixin:
+    """
+    Кэширует страницу целиком для анонимных GET-запросов.
+
+    Ключ включает поколение данных, поэтому после изменения новостей
+    или комментариев страница сразу строится заново. Авторизованные
+    пользователи видят форму и ссылки редактирования, кэш для них
+    не используется.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'GET' or request.user.is_authenticated:
+            return super().dispatch(request, *args, **kwargs)
+        generation = get_generation()
+        if generation is None:
+            return super().dispatch(request, *args, **kwargs)
+        key = page_cache_key(request, generation)
+        content = cache.get(key)
+        count_cache('news_page', content is not None)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code == 200:
+            response.add_post_render_callback(
+                lambda response: cache.set(
+                    key, response.content, settings.NEWS_PAGE_CACHE_TIMEOUT
+                )
+            )
+        return response
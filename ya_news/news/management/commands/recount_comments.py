@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from news.models import News
+from news.signals import recount_comment_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает comment_count и last_comment_at у новостей '
+        'по таблице комментариев.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько новостей пересчитывать в одной транзакции.',
+        )
+
+    def handle(self, *args, chunk_size, **options):
+        news_ids = News.objects.order_by('pk').values_list('pk', flat=True)
+        last_id = 0
+        updated = 0
+        while chunk := list(news_ids.filter(pk__gt=last_id)[:chunk_size]):
+            with transaction.atomic():
+                updated += recount_comment_counters(
+                    News.objects.filter(pk__in=chunk)
+                )
+            last_id = chunk[-1]
+            self.stdout.write(f'Пересчитано новостей: {updated}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики комментариев пересчитаны у {updated} новостей.'
+        ))
@@ -0,0 +1,210 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+REQUEST_DURATION = 'http_request_duration_seconds'
+REQUEST_QUERIES = 'http_request_queries'
+RESPONSES = 'http_responses_total'
+RESPONSE_SIZE = 'http_response_size_bytes_total'
+CACHE_REQUESTS = 'cache_requests_total'
+CACHE_HIT_RATIO = 'cache_hit_ratio'
+
+HISTOGRAMS = {
+    REQUEST_DURATION: (
+        0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5,
+    ),
+    REQUEST_QUERIES: (0, 1, 2, 4, 8, 16, 32, 64),
+}
+COUNTERS = (RESPONSES, RESPONSE_SIZE, CACHE_REQUESTS)
+# Метки берутся из запроса, поэтому их значения ограничены набором:
+# иначе каждый новый метод добавлял бы серии без ограничений.
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+OTHER = 'other'
+UNRESOLVED = 'unresolved'
+HELP = {
+    REQUEST_DURATION: 'Время обработки запроса по маршрутам.',
+    REQUEST_QUERIES: 'Число SQL-запросов на запрос по маршрутам.',
+    RESPONSES: 'Ответы по маршрутам и кодам статуса.',
+    RESPONSE_SIZE: 'Размер тел ответов по маршрутам.',
+    CACHE_REQUESTS: 'Обращения к кэшам: попадания и промахи.',
+    CACHE_HIT_RATIO: 'Доля попаданий в кэш.',
+}
+
+
+class MetricsStore:
+    """
+    Счётчики процесса с выгрузкой в общий каталог.
+
+    Гистограмма хранится как счётчики _bucket, _sum и _count, поэтому
+    все значения только растут и складываются между процессами.
+    Блокировка держится лишь на время сложения в словаре; в файл
+    METRICS_DIR/<pid>.json процесс пишет не чаще раза в
+    METRICS_FLUSH_INTERVAL секунд, заменяя его целиком.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._values = defaultdict(float)
+        self._flushed_at = 0.0
+
+    def inc(self, name, labels, value=1):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] += value
+        self.maybe_flush()
+
+    def observe(self, name, labels, value):
+        """Наблюдение value в гистограмме name."""
+        key_labels = tuple(sorted(labels.items()))
+        with self._lock:
+            for bound in HISTOGRAMS[name]:
+                if value <= bound:
+                    self._values[(
+                        f'{name}_bucket', key_labels + (('le', bound),)
+                    )] += 1
+            self._values[(
+                f'{name}_bucket', key_labels + (('le', '+Inf'),)
+            )] += 1
+            self._values[(f'{name}_sum', key_labels)] += value
+            self._values[(f'{name}_count', key_labels)] += 1
+        self.maybe_flush()
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._values)
+
+    def maybe_flush(self):
+        if settings.METRICS_DIR is None:
+            return
+        now = time.monotonic()
+        if now - self._flushed_at < settings.METRICS_FLUSH_INTERVAL:
+            return
+        self._flushed_at = now
+        self.flush()
+
+    def flush(self):
+        """Записываем счётчики процесса в METRICS_DIR/<pid>.json."""
+        directory = Path(settings.METRICS_DIR)
+        directory.mkdir(parents=True, exist_ok=True)
+        samples = [
+            [name, list(labels), value]
+            for (name, labels), value in self.snapshot().items()
+        ]
+        descriptor, temporary = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(descriptor, 'w') as file:
+            json.dump(samples, file)
+        os.replace(temporary, directory / f'{os.getpid()}.json')
+
+    def collect(self):
+        """Сумма счётчиков всех процессов, записавших файлы в каталог."""
+        if settings.METRICS_DIR is None:
+            return self.snapshot()
+        self.flush()
+        values = defaultdict(float)
+        for path in Path(settings.METRICS_DIR).glob('*.json'):
+            try:
+                samples = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, labels, value in samples:
+                values[(name, tuple(tuple(pair) for pair in labels))] += value
+        return values
+
+
+store = MetricsStore()
+
+
+def observe_request(view, method, status, duration, queries, size):
+    """Учитываем обработанный запрос к маршруту view."""
+    labels = {
+        'view': view or UNRESOLVED,
+        'method': method if method in METHODS else OTHER,
+    }
+    store.observe(REQUEST_DURATION, labels, duration)
+    store.observe(REQUEST_QUERIES, labels, queries)
+    store.inc(RESPONSES, {**labels, 'status': str(status)})
+    if size is not None:
+        store.inc(RESPONSE_SIZE, labels, size)
+
+
+def count_cache(name, hit):
+    """Учитываем попадание или промах кэша name."""
+    store.inc(CACHE_REQUESTS, {'cache': name, 'hit': str(hit).lower()})
+
+
+def escape(value):
+    return str(value).replace('\\', '\\\\').replace(
+        '"', '\\"'
+    ).replace('\n', '\\n')
+
+
+def format_labels(labels):
+    return ','.join(f'{name}="{escape(value)}"' for name, value in labels)
+
+
+def format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def family(name):
+    for suffix in ('_bucket', '_sum', '_count'):
+        if name.endswith(suffix) and name[:-len(suffix)] in HISTOGRAMS:
+            return name[:-len(suffix)]
+    return name
+
+
+def cache_hit_ratios(values):
+    requests = defaultdict(lambda: [0.0, 0.0])
+    for (name, labels), value in values.items():
+        if name == CACHE_REQUESTS:
+            labels = dict(labels)
+            requests[labels['cache']][labels['hit'] == 'true'] += value
+    return {
+        (CACHE_HIT_RATIO, (('cache', cache_name),)): hits / (hits + misses)
+        for cache_name, (misses, hits) in requests.items()
+    }
+
+
+def render():
+    """Все метрики в текстовом формате Prometheus."""
+    values = store.collect()
+    values.update(cache_hit_ratios(values))
+    families = defaultdict(list)
+    for (name, labels), value in values.items():
+        families[family(name)].append((name, labels, value))
+    lines = []
+    for name in sorted(families):
+        kind = (
+            'histogram' if name in HISTOGRAMS
+            else 'counter' if name in COUNTERS
+            else 'gauge'
+        )
+        lines.append(f'# HELP {name} {HELP[name]}')
+        lines.append(f'# TYPE {name} {kind}')
+        for sample, labels, value in sorted(
+            families[name], key=lambda item: sort_key(*item)
+        ):
+            lines.append(
+                f'{sample}{{{format_labels(labels)}}} {format_value(value)}'
+            )
+    return '\n'.join(lines) + '\n'
+
+
+def sort_key(sample, labels, _value):
+    """Сэмплы одной метки подряд, границы гистограммы по возрастанию."""
+    other = tuple(pair for pair in labels if pair[0] != 'le')
+    bound = dict(labels).get('le', 0)
+    return other, sample, float(bound)
+
+
+def metrics_view(request):
+    return HttpResponse(
+        render(), content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -0,0 +1,177 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import (
+    iscoroutinefunction, markcoroutinefunction, sync_to_async
+)
+from django.conf import settings
+from django.db import connections
+
+from .metrics import observe_request
+
+logger = logging.getLogger(__name__)
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше SQL-запросов, чем ему разрешено."""
+
+
+class QueryCounter:
+    """
+    Обёртка execute_wrapper, считающая выполненные SQL-запросы
+    и их суммарное время в секундах.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - started
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        return self._stack.__exit__(*exc_info)
+
+    # Соединения с базой свои у каждого потока, а асинхронный ORM
+    # выполняет запросы в потоке sync_to_async запроса. Обёртки ставятся
+    # в том же потоке, иначе запросы не были бы учтены.
+    async def __aenter__(self):
+        return await sync_to_async(self.__enter__)()
+
+    async def __aexit__(self, *exc_info):
+        return await sync_to_async(self.__exit__)(*exc_info)
+
+
+class QueryBudgetMiddleware:
+    """
+    Сверяет число SQL-запросов с бюджетом маршрута из QUERY_BUDGETS.
+
+    При QUERY_BUDGET_STRICT превышение бюджета поднимает исключение,
+    иначе пишется предупреждение в журнал. Промежуточный слой должен
+    стоять первым, чтобы учитывались и запросы сессий и пользователей.
+    Работает и в синхронной, и в асинхронной цепочке, чтобы под ASGI
+    Django не переводил весь запрос в поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        self.check_request(request, counter.count)
+        return response
+
+    async def __acall__(self, request):
+        async with QueryCounter() as counter:
+            response = await self.get_response(request)
+        self.check_request(request, counter.count)
+        return response
+
+    def check_request(self, request, count):
+        if request.resolver_match is not None:
+            self.check(request.resolver_match.view_name, count)
+
+    def check(self, view_name, count):
+        budget = settings.QUERY_BUDGETS.get(view_name)
+        if budget is None or count <= budget:
+            return
+        message = (
+            f'{view_name}: выполнено SQL-запросов {count}, '
+            f'бюджет {budget}'
+        )
+        if settings.QUERY_BUDGET_STRICT:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class ServerTimingMiddleware:
+    """
+    Время обработки запроса в заголовке Server-Timing, в журнале
+    и в метриках маршрута.
+
+    db — число и время SQL-запросов, tpl — отрисовка TemplateResponse,
+    total — весь ответ от этого слоя и ниже. Та же запись с именем
+    маршрута пишется в журнал одной строкой JSON.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = time.perf_counter()
+        with QueryCounter() as counter:
+            response = self.get_response(request)
+        return self.report(request, response, started, counter)
+
+    async def __acall__(self, request):
+        started = time.perf_counter()
+        async with QueryCounter() as counter:
+            response = await self.get_response(request)
+        return self.report(request, response, started, counter)
+
+    def report(self, request, response, started, counter):
+        total = time.perf_counter() - started
+        template = getattr(response, 'template_duration', 0.0)
+        response.headers['Server-Timing'] = (
+            f'db;dur={counter.duration * 1000:.1f};'
+            f'desc="{counter.count} queries", '
+            f'tpl;dur={template * 1000:.1f}, '
+            f'total;dur={total * 1000:.1f}'
+        )
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        observe_request(
+            view_name,
+            request.method,
+            response.status_code,
+            total,
+            counter.count,
+            None if response.streaming else len(response.content),
+        )
+        if not logger.isEnabledFor(logging.INFO):
+            return response
+        logger.info(json.dumps({
+            'view': view_name,
+            'method': request.method,
+            'status': response.status_code,
+            'queries': counter.count,
+            'db_ms': round(counter.duration * 1000, 2),
+            'template_ms': round(template * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }))
+        return response
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def rendered(response):
+            response.template_duration = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
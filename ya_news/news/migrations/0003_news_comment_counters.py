@@ -0,0 +1,44 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:40
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_comment_counters(apps, schema_editor):
+    News = apps.get_model('news', 'News')
+    Comment = apps.get_model('news', 'Comment')
+    comments = Comment.objects.filter(news=OuterRef('pk')).order_by()
+    News.objects.update(
+        comment_count=Coalesce(Subquery(
+            comments.values('news').annotate(
+                count=Count('pk')
+            ).values('count')
+        ), 0),
+        last_comment_at=Subquery(
+            comments.order_by('-created').values('created')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('news', '0002_news_comment_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='news',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='news',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(
+            fill_comment_counters, migrations.RunPython.noop
+        ),
+    ]
@@ -8,9 +8,16 @@ class News(models.Model):
     title = models.CharField(max_length=50)
     text = models.TextField()
     date = models.DateField(default=datetime.today)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(
+        null=True, blank=True, editable=False
+    )
 
     class Meta:
         ordering = ('-date',)
+        indexes = (
+            models.Index(fields=('date', 'id'), name='news_date_id_idx'),
+        )
         verbose_name_plural = 'Новости'
         verbose_name = 'Новость'
 
@@ -21,7 +28,8 @@ class News(models.Model):
 class Comment(models.Model):
     news = models.ForeignKey(
         News,
-        on_delete=models.CASCADE
+        on_delete=models.CASCADE,
+        db_index=False,
     )
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -32,6 +40,12 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ('created',)
+        indexes = (
+            models.Index(
+                fields=('news', 'created', 'id'),
+                name='comment_news_created_id_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:50]
@@ -0,0 +1,103 @@
+import logging
+import os
+import re
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+def words_pattern(words):
+    """
+    Регулярное выражение, находящее в тексте любое из слов.
+
+    Слова собираются в префиксное дерево, поэтому общие начала слов
+    проверяются один раз, а не для каждого слова заново.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node):
+    branches = [
+        re.escape(char) + _node_pattern(child)
+        for char, child in sorted(node.items())
+        if char
+    ]
+    if not branches:
+        return ''
+    if '' in node:
+        return '(?:' + '|'.join(branches) + ')?'
+    if len(branches) == 1:
+        return branches[0]
+    return '(?:' + '|'.join(branches) + ')'
+
+
+class BadWordsMatcher:
+    """Поиск сразу всех запрещённых слов за один проход по тексту."""
+
+    def __init__(self, words):
+        self.words = frozenset(
+            word.strip().lower() for word in words if word.strip()
+        )
+        pattern = words_pattern(self.words)
+        self.regex = re.compile(pattern) if pattern else None
+
+    def search(self, text):
+        """Первое найденное запрещённое слово или None."""
+        if self.regex is None:
+            return None
+        match = self.regex.search(text.lower())
+        return match.group() if match else None
+
+
+class BadWordsSource:
+    """
+    Запрещённые слова из кода и из файла NEWS_BAD_WORDS_FILE.
+
+    Файл содержит по слову в строке, строки с # пропускаются.
+    Файл перечитывается, как только меняется время его изменения,
+    поэтому список обновляется без перезапуска процесса.
+    """
+
+    def __init__(self, default_words):
+        self.default_words = tuple(default_words)
+        self._loaded = (None, None, BadWordsMatcher(self.default_words))
+
+    def _read(self, path):
+        with open(path, encoding='utf-8') as file:
+            return [
+                line for line in file
+                if line.strip() and not line.lstrip().startswith('#')
+            ]
+
+    def get_matcher(self):
+        """
+        Проверка по текущему списку слов.
+
+        Если файл недоступен (удалён или как раз заменяется), остаётся
+        последний загруженный список, а в журнал пишется предупреждение.
+        """
+        path = settings.NEWS_BAD_WORDS_FILE
+        loaded_path, loaded_mtime, matcher = self._loaded
+        try:
+            mtime = os.stat(path).st_mtime_ns if path else None
+            if (path, mtime) != (loaded_path, loaded_mtime):
+                words = list(self.default_words)
+                if path:
+                    words.extend(self._read(path))
+                matcher = BadWordsMatcher(words)
+                self._loaded = (path, mtime, matcher)
+        except OSError as error:
+            logger.warning(
+                'Не удалось прочитать NEWS_BAD_WORDS_FILE: %s', error
+            )
+        return matcher
+
+    def search(self, text):
+        return self.get_matcher().search(text)
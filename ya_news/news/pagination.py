@@ -0,0 +1,88 @@
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import Http404
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+INVALID_CURSOR = 'Некорректный курсор страницы.'
+
+
+class KeysetPaginator:
+    """
+    Постраничный вывод по ключу сортировки.
+
+    Вместо OFFSET следующая страница выбирается условием «строго после
+    последней показанной записи» по полям сортировки, поэтому запрос
+    стоит одинаково, как бы далеко ни был пролистан список.
+    Последним полем сортировки должен быть уникальный ключ (обычно id).
+    """
+
+    def __init__(self, queryset, ordering, per_page):
+        self.queryset = queryset.order_by(*ordering)
+        self.ordering = ordering
+        self.per_page = per_page
+        opts = queryset.model._meta
+        self.fields = [opts.get_field(name.lstrip('-')) for name in ordering]
+
+    def encode_cursor(self, obj):
+        """Курсор, указывающий на запись obj."""
+        values = [field.value_to_string(obj) for field in self.fields]
+        return urlsafe_base64_encode(json.dumps(values).encode())
+
+    def decode_cursor(self, cursor):
+        """Значения полей сортировки, закодированные в курсоре."""
+        try:
+            values = json.loads(urlsafe_base64_decode(cursor))
+            return [
+                field.to_python(value)
+                for field, value in zip(self.fields, values, strict=True)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise Http404(INVALID_CURSOR)
+
+    def _after(self, values):
+        """
+        Условие «строго после» записи с указанными значениями полей.
+
+        Нестрогое условие по первому полю дублируется отдельно: по нему
+        база данных начинает чтение индекса с нужного места.
+        """
+        condition = Q()
+        equal = Q()
+        for name, field, value in zip(self.ordering, self.fields, values):
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field.name}__{lookup}': value})
+            equal &= Q(**{field.name: value})
+        name, field, value = self.ordering[0], self.fields[0], values[0]
+        lookup = 'lte' if name.startswith('-') else 'gte'
+        return Q(**{f'{field.name}__{lookup}': value}) & condition
+
+    def get_page(self, cursor=None):
+        """Страница, начинающаяся сразу после курсора."""
+        queryset = self.queryset
+        if cursor:
+            queryset = queryset.filter(self._after(self.decode_cursor(cursor)))
+        return queryset[:self.per_page]
+
+    def _rest(self, page):
+        """Записи после страницы page или None, если страница неполная."""
+        if len(page) < self.per_page:
+            return None
+        values = [field.value_from_object(page[-1]) for field in self.fields]
+        return self.queryset.filter(self._after(values))
+
+    def get_next_cursor(self, page):
+        """Курсор следующей страницы или None, если страница последняя."""
+        page = list(page)
+        rest = self._rest(page)
+        if rest is None or not rest.exists():
+            return None
+        return self.encode_cursor(page[-1])
+
+    async def aget_next_cursor(self, page):
+        """Асинхронный вариант get_next_cursor для списка записей."""
+        rest = self._rest(page)
+        if rest is None or not await rest.aexists():
+            return None
+        return self.encode_cursor(page[-1])
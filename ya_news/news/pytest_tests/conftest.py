@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 
 import pytest
+from django.core.cache import cache
 from django.test.client import Client
 from django.utils import timezone
 from django.conf import settings
@@ -9,6 +10,27 @@ from django.urls import reverse
 from news.models import News, Comment
 
 
+def pytest_configure(config):
+    """
+    Тесты работают с кэшем в памяти, а не с файловым кэшем проекта:
+    иначе cache.clear() стирал бы страницы и сессии запущенного сервера.
+    """
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Превышение бюджета SQL-запросов маршрута роняет тест."""
+    settings.QUERY_BUDGET_STRICT = True
+
+
 @pytest.fixture
 def author(django_user_model):
     return django_user_model.objects.create(username='Автор')
@@ -0,0 +1,125 @@
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import SyncToAsync, async_to_sync
+from django.core.handlers.asgi import ASGIHandler
+from django.db import connections
+from django.test import AsyncClient
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+
+from news import async_views, urls as news_urls
+from news.middleware import QueryBudgetExceeded
+from news.routers import read_from_replica
+from news.models import Comment
+from yanews.urls import auth_urls
+
+urlpatterns = [
+    path('', include(([
+        path('', async_views.AsyncNewsList.as_view(), name='home'),
+        path(
+            'news/<int:pk>/',
+            async_views.AsyncNewsDetail.as_view(),
+            name='detail'
+        ),
+        *(
+            pattern for pattern in news_urls.urlpatterns
+            if pattern.name in ('edit', 'delete')
+        ),
+    ], 'news'))),
+    path('auth/', include(auth_urls)),
+]
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.urls('news.pytest_tests.test_async_views'),
+]
+
+
+@pytest.fixture
+def async_author_client(author):
+    client = AsyncClient()
+    async_to_sync(client.aforce_login)(author)
+    return client
+
+
+def get(client, url, **kwargs):
+    return async_to_sync(client.get)(url, **kwargs)
+
+
+def test_async_news_list(async_client, all_news):
+    """Проверяем, что асинхронная главная страница выводит новости."""
+    response = get(async_client, reverse('news:home'))
+    assert response.status_code == HTTPStatus.OK
+    object_list = response.context['object_list']
+    assert len(object_list) > 0
+    assert response.context['next_cursor']
+
+
+def test_async_news_detail(async_client, news, comment):
+    """Проверяем, что асинхронная страница новости выводит комментарии
+    и отвечает 304 на запрос с актуальным ETag.
+    """
+    url = reverse('news:detail', args=(news.pk,))
+    response = get(async_client, url)
+    assert response.status_code == HTTPStatus.OK
+    assert response.context['comments'] == [comment]
+    assert 'form' not in response.context
+    response = get(
+        async_client, url, headers={'If-None-Match': response['ETag']}
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_async_news_detail_for_author(async_author_client, news, author):
+    """Проверяем, что авторизованный пользователь видит форму
+    и может оставить комментарий.
+    """
+    url = reverse('news:detail', args=(news.pk,))
+    response = get(async_author_client, url)
+    assert 'form' in response.context
+    response = async_to_sync(async_author_client.post)(
+        url, {'text': 'Асинхронный комментарий'}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert Comment.objects.filter(news=news, author=author).exists()
+
+
+def test_async_query_budget(async_client, settings, all_news):
+    """
+    Проверяем, что в асинхронной цепочке бюджет SQL-запросов
+    считает запросы асинхронного ORM.
+    """
+    settings.QUERY_BUDGETS = {**settings.QUERY_BUDGETS, 'news:home': 0}
+    with pytest.raises(QueryBudgetExceeded):
+        get(async_client, reverse('news:home'))
+
+
+def test_async_server_timing(async_client, news):
+    """Проверяем, что асинхронная страница получает Server-Timing."""
+    response = get(async_client, reverse('news:detail', args=(news.pk,)))
+    assert response['Server-Timing'].startswith('db;dur=')
+
+
+def test_async_middleware_chain_stays_async():
+    """
+    Проверяем, что под ASGI цепочка промежуточных слоёв
+    не переводится в поток целиком.
+    """
+    assert not isinstance(ASGIHandler()._middleware_chain, SyncToAsync)
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_async_detail_reads_from_replica(async_client, settings, news):
+    """
+    Проверяем, что асинхронная страница новости читается с реплики,
+    а после запроса чтение возвращается на основную базу.
+    """
+    settings.USE_READ_REPLICA = True
+    with CaptureQueriesContext(connections['replica']) as replica:
+        response = get(
+            async_client, reverse('news:detail', args=(news.pk,))
+        )
+    assert response.status_code == HTTPStatus.OK
+    assert replica.captured_queries
+    assert not read_from_replica.get()
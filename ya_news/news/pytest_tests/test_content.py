@@ -2,6 +2,7 @@ import pytest
 from django.conf import settings
 
 from news.forms import CommentForm
+from news.models import Comment
 
 
 @pytest.mark.django_db
@@ -25,6 +26,34 @@ def test_news_order(client, url_home):
     assert all_dates == sorted_dates
 
 
+@pytest.mark.django_db
+def test_news_next_page(client, url_home, all_news):
+    """
+    Проверяем, что по курсору открывается следующая страница
+    с более старыми новостями без повторов.
+    """
+    first_page = client.get(url_home).context
+    next_cursor = first_page['next_cursor']
+    assert next_cursor
+    response = client.get(url_home, {'cursor': next_cursor})
+    second_page = list(response.context['object_list'])
+    assert second_page
+    assert response.context['next_cursor'] is None
+    last_on_first_page = list(first_page['object_list'])[-1]
+    assert all(
+        (news.date, news.id) < (last_on_first_page.date, last_on_first_page.id)
+        for news in second_page
+    )
+
+
+@pytest.mark.django_db
+def test_news_comment_count(client, url_home, comment):
+    """Проверяем, что на главной выводится число комментариев новости."""
+    response = client.get(url_home)
+    news = response.context['object_list'][0]
+    assert news.comment_count == 1
+
+
 @pytest.mark.django_db
 def test_comments_order(client, url_detail_comment, new_comment):
     """На отдельной странице новости проверяем сортировку
@@ -39,6 +68,28 @@ def test_comments_order(client, url_detail_comment, new_comment):
     assert all_timestamps == sorted_timestamps
 
 
+@pytest.mark.django_db
+def test_comments_pages(client, settings, url_detail_news, new_comment):
+    """
+    Проверяем, что комментарии выводятся страницами заданного
+    размера, а следующая страница продолжает предыдущую.
+    """
+    settings.COMMENTS_COUNT_ON_PAGE = 4
+    shown = []
+    cursor = None
+    while True:
+        data = {'cursor': cursor} if cursor else {}
+        response = client.get(url_detail_news, data)
+        page = list(response.context['comments'])
+        assert len(page) <= settings.COMMENTS_COUNT_ON_PAGE
+        shown.extend(page)
+        cursor = response.context['next_cursor']
+        if cursor is None:
+            break
+    news = response.context['news']
+    assert shown == list(news.comment_set.order_by('created', 'id'))
+
+
 @pytest.mark.django_db
 def test_anonymous_client_has_no_form(client, url_detail_comment):
     """
@@ -58,3 +109,56 @@ def test_authorized_client_has_form(author_client, url_detail_comment):
     response = author_client.get(url_detail_comment)
     assert 'form' in response.context
     assert isinstance(response.context['form'], CommentForm)
+
+
+@pytest.mark.django_db
+def test_anonymous_pages_are_cached(
+    client,
+    django_assert_num_queries,
+    url_home,
+    url_detail_news
+):
+    """
+    Проверяем, что повторный анонимный запрос главной страницы
+    и страницы новости отдаётся из кэша без запросов к базе.
+    """
+    for url in (url_home, url_detail_news):
+        content = client.get(url).content
+        with django_assert_num_queries(0):
+            assert client.get(url).content == content
+
+
+@pytest.mark.django_db
+def test_new_comment_invalidates_page_cache(
+    client,
+    author,
+    news,
+    url_detail_news,
+    django_capture_on_commit_callbacks
+):
+    """Проверяем, что новый комментарий виден на закэшированной
+    странице новости сразу после фиксации транзакции, но не раньше.
+    """
+    client.get(url_detail_news)
+    with django_capture_on_commit_callbacks() as callbacks:
+        Comment.objects.create(news=news, author=author, text='Свежий')
+        response = client.get(url_detail_news)
+        assert 'Свежий' not in response.content.decode()
+    for callback in callbacks:
+        callback()
+    response = client.get(url_detail_news)
+    assert 'Свежий' in response.content.decode()
+
+
+@pytest.mark.django_db
+def test_authorized_client_bypasses_page_cache(
+    client,
+    author_client,
+    url_detail_news
+):
+    """Проверяем, что авторизованный пользователь не получает
+    страницу из кэша.
+    """
+    client.get(url_detail_news)
+    response = author_client.get(url_detail_news)
+    assert 'form' in response.context
@@ -1,11 +1,22 @@
+import os
+import sqlite3
 from http import HTTPStatus
+from io import StringIO
 
 import pytest
 from pytest_django.asserts import assertRedirects, assertFormError
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, connections
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
 
+from news.auth import user_cache_key
 from news.forms import BAD_WORDS, WARNING
-from news.models import Comment
+from news.models import Comment, News
+from news.moderation import BadWordsMatcher
+from yanews.warmup import warmup
 
 
 User = get_user_model()
@@ -66,6 +77,77 @@ def test_user_cant_use_bad_words(
     assert comments_count == 0
 
 
+@pytest.mark.parametrize(
+    'text, expected',
+    (
+        ('просто текст', False),
+        ('слово НЕГОДНИК в тексте', True),
+        ('негодяйство', True),
+        ('редиска', True),
+        ('ре-дис', False),
+    ),
+)
+def test_bad_words_matcher(text, expected):
+    """Проверяем, что слова находятся так же, как подстроки, в том числе
+    слова, одно из которых начинается с другого.
+    """
+    words = ('негод', 'негодяй', 'редис', 'ре.дис')
+    matcher = BadWordsMatcher(words)
+    assert (matcher.search(text) is not None) is expected
+    assert any(word in text.lower() for word in words) is expected
+
+
+@pytest.mark.django_db
+def test_bad_words_file_is_reloaded(
+    not_author_client,
+    settings,
+    tmp_path,
+    url_detail_news
+):
+    """
+    Проверяем, что запрещённые слова из файла применяются
+    без перезапуска и обновляются при изменении файла.
+    """
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('# список\nбармалей\n', encoding='utf-8')
+    settings.NEWS_BAD_WORDS_FILE = words_file
+    for word, updated in (('бармалей', False), ('карабас', True)):
+        if updated:
+            words_file.write_text('карабас\n', encoding='utf-8')
+            os.utime(words_file, ns=(0, 0))
+        response = not_author_client.post(
+            url_detail_news, data={'text': f'Ну и {word}!'}
+        )
+        assertFormError(response.context['form'], 'text', WARNING)
+    assert Comment.objects.count() == 0
+
+
+@pytest.mark.django_db
+def test_missing_bad_words_file_keeps_last_words(
+    not_author_client,
+    settings,
+    tmp_path,
+    url_detail_news,
+    caplog
+):
+    """
+    Проверяем, что без файла запрещённых слов комментарий проверяется
+    по последнему загруженному списку, а в журнал пишется предупреждение.
+    """
+    words_file = tmp_path / 'bad_words.txt'
+    words_file.write_text('бармалей\n', encoding='utf-8')
+    settings.NEWS_BAD_WORDS_FILE = words_file
+    not_author_client.post(url_detail_news, data={'text': 'Текст'})
+    words_file.unlink()
+    with caplog.at_level('WARNING', logger='news.moderation'):
+        response = not_author_client.post(
+            url_detail_news, data={'text': 'Ну и бармалей!'}
+        )
+    assertFormError(response.context['form'], 'text', WARNING)
+    assert 'NEWS_BAD_WORDS_FILE' in caplog.text
+    assert Comment.objects.count() == 1
+
+
 @pytest.mark.django_db
 def test_author_can_delete_comment(
     author_client,
@@ -130,3 +212,137 @@ def test_user_cant_edit_comment_of_another_user(
     assert comment.text == comment_db.text
     assert comment.news == comment_db.news
     assert comment.author == comment_db.author
+
+
+@pytest.mark.django_db
+def test_comment_counters_follow_comments(
+    not_author_client,
+    news,
+    url_detail_news,
+    form_data
+):
+    """
+    Проверяем, что число комментариев и время последнего комментария
+    у новости обновляются при создании и удалении комментария.
+    """
+    not_author_client.post(url_detail_news, data=form_data)
+    news.refresh_from_db()
+    comment = Comment.objects.get()
+    assert news.comment_count == 1
+    assert news.last_comment_at == comment.created
+    comment.delete()
+    news.refresh_from_db()
+    assert news.comment_count == 0
+    assert news.last_comment_at is None
+
+
+def news_updates(queries):
+    return [
+        query for query in queries.captured_queries
+        if query['sql'].startswith('UPDATE "news_news"')
+    ]
+
+
+@pytest.mark.django_db
+def test_comment_counters_follow_cascade(author, not_author, news):
+    """
+    Проверяем, что при удалении автора счётчики комментариев
+    пересчитываются одним запросом, а не по запросу на комментарий.
+    """
+    other_news = News.objects.create(title='Другая', text='Текст')
+    for item in (news, news, other_news):
+        Comment.objects.create(news=item, author=author, text='Текст')
+    kept = Comment.objects.create(news=news, author=not_author, text='Текст')
+    with CaptureQueriesContext(connection) as queries:
+        author.delete()
+    assert len(news_updates(queries)) == 1
+    news.refresh_from_db()
+    other_news.refresh_from_db()
+    assert (news.comment_count, news.last_comment_at) == (1, kept.created)
+    assert (other_news.comment_count, other_news.last_comment_at) == (0, None)
+
+
+@pytest.mark.django_db
+def test_news_delete_skips_comment_counters(author, news):
+    """
+    Проверяем, что удаление новости не обновляет её счётчик
+    на каждый удаляемый вместе с ней комментарий.
+    """
+    Comment.objects.bulk_create(
+        Comment(news=news, author=author, text='Текст') for _ in range(3)
+    )
+    with CaptureQueriesContext(connection) as queries:
+        news.delete()
+    assert not news_updates(queries)
+    assert not Comment.objects.exists()
+
+
+@pytest.mark.django_db
+def test_comment_delete_with_drifted_counter(
+    author_client, news, comment, url_delete_comment
+):
+    """
+    Проверяем, что комментарий удаляется, даже если счётчик
+    комментариев уже разошёлся до нуля.
+    """
+    News.objects.update(comment_count=0)
+    author_client.delete(url_delete_comment)
+    news.refresh_from_db()
+    assert not Comment.objects.exists()
+    assert news.comment_count == 0
+
+
+@pytest.mark.django_db
+def test_recount_comments_repairs_drift(news, comment):
+    """Проверяем, что команда recount_comments исправляет счётчики."""
+    News.objects.update(comment_count=42, last_comment_at=None)
+    call_command('recount_comments', chunk_size=1, stdout=StringIO())
+    news.refresh_from_db()
+    assert news.comment_count == 1
+    assert news.last_comment_at == comment.created
+
+
+def test_sync_replica_copies_primary(tmp_path, monkeypatch):
+    """Проверяем, что команда sync_replica копирует базу в реплику."""
+    primary = tmp_path / 'primary.sqlite3'
+    replica = tmp_path / 'replica.sqlite3'
+    with sqlite3.connect(primary) as database:
+        database.execute('CREATE TABLE note (text)')
+        database.execute("INSERT INTO note VALUES ('Текст')")
+    monkeypatch.setitem(connections['default'].settings_dict, 'NAME', primary)
+    monkeypatch.setitem(connections['replica'].settings_dict, 'NAME', replica)
+    call_command('sync_replica', stdout=StringIO())
+    with sqlite3.connect(replica) as database:
+        assert database.execute('SELECT text FROM note').fetchall() == [
+            ('Текст',)
+        ]
+
+
+@pytest.mark.django_db
+def test_session_and_user_are_cached(author, author_client, url_home):
+    """
+    Проверяем, что сессия и пользователь берутся из кэша, а запись
+    о пользователе сбрасывается при его сохранении.
+    """
+    author_client.get(url_home)
+    with CaptureQueriesContext(connection) as queries:
+        author_client.get(url_home)
+    tables = ' '.join(query['sql'] for query in queries.captured_queries)
+    assert 'django_session' not in tables
+    assert 'auth_user' not in tables
+    assert cache.get(user_cache_key(author.pk)) == author
+    author.username = 'Новое имя'
+    author.save()
+    assert cache.get(user_cache_key(author.pk)) is None
+    response = author_client.get(url_home)
+    assert response.context['user'].username == 'Новое имя'
+
+
+@pytest.mark.django_db
+def test_warmup_compiles_templates():
+    """Проверяем, что прогрев кладёт шаблоны страниц в кэш загрузчика."""
+    loader = engines['django'].engine.template_loaders[0]
+    loader.reset()
+    warmup()
+    for name in ('news/home.html', 'news/detail.html', 'base.html'):
+        assert name in loader.get_template_cache
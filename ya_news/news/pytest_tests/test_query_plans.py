@@ -0,0 +1,46 @@
+import pytest
+from django.db import connection
+
+from news.views import NewsDetail, NewsList
+
+pytestmark = pytest.mark.skipif(
+    connection.vendor != 'sqlite',
+    reason='EXPLAIN QUERY PLAN есть только в SQLite.'
+)
+
+
+def query_plan(queryset):
+    """Строки плана запроса SQLite для queryset."""
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def assert_uses_indexes(queryset):
+    """Запрос не сортирует во временном B-дереве и не читает всю таблицу."""
+    plan = query_plan(queryset)
+    for step in plan:
+        assert 'TEMP B-TREE' not in step, plan
+        assert not step.startswith('SCAN') or 'INDEX' in step, plan
+
+
+@pytest.mark.django_db
+def test_news_list_query_plan(news, comment):
+    """Проверяем, что главная страница читает новости по индексу."""
+    news.refresh_from_db()
+    paginator = NewsList().get_keyset_paginator()
+    assert_uses_indexes(paginator.get_page())
+    next_page = paginator.get_page(paginator.encode_cursor(news))
+    assert_uses_indexes(next_page)
+    assert any(step.startswith('SEARCH') for step in query_plan(next_page))
+
+
+@pytest.mark.django_db
+def test_news_detail_query_plan(news, comment):
+    """Проверяем, что комментарии новости читаются по индексу."""
+    view = NewsDetail()
+    view.object = news
+    paginator = view.get_keyset_paginator()
+    assert_uses_indexes(paginator.get_page())
+    assert_uses_indexes(paginator.get_page(paginator.encode_cursor(comment)))
@@ -1,8 +1,16 @@
+import json
+import os
 from http import HTTPStatus
 
 import pytest
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
 from pytest_django.asserts import assertRedirects
 
+from news import metrics, urls as news_urls
+from news.middleware import QueryBudgetExceeded
+from news.models import Comment
+
 
 @pytest.mark.django_db
 @pytest.mark.parametrize(
@@ -65,3 +73,173 @@ def test_redirects(client, url, url_login):
     expected_url = f'{url_login}?next={url}'
     response = client.get(url)
     assertRedirects(response, expected_url)
+
+
+@pytest.mark.django_db
+def test_invalid_cursor(client, url_home):
+    """Проверяем, что некорректный курсор страницы возвращает ошибку 404."""
+    response = client.get(url_home, {'cursor': 'не-курсор'})
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'url',
+    (
+        (pytest.lazy_fixture('url_home')),
+        (pytest.lazy_fixture('url_detail_news')),
+    ),
+)
+def test_conditional_get(client, url):
+    """
+    Проверяем, что страницы новостей отвечают 304 на запрос
+    с актуальными ETag или Last-Modified.
+    """
+    response = client.get(url)
+    etag = response.headers['ETag']
+    last_modified = response.headers['Last-Modified']
+    response = client.get(url, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    response = client.get(url, headers={'If-Modified-Since': last_modified})
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+@pytest.mark.django_db
+def test_conditional_get_after_new_comment(
+    client,
+    author,
+    news,
+    url_detail_news,
+    django_capture_on_commit_callbacks
+):
+    """Проверяем, что после нового комментария ETag страницы меняется."""
+    etag = client.get(url_detail_news).headers['ETag']
+    with django_capture_on_commit_callbacks(execute=True):
+        Comment.objects.create(news=news, author=author, text='Свежий')
+    response = client.get(url_detail_news, headers={'If-None-Match': etag})
+    assert response.status_code == HTTPStatus.OK
+    assert response.headers['ETag'] != etag
+
+
+@pytest.mark.django_db
+def test_no_validators_for_authorized_client(author_client, url_detail_news):
+    """Проверяем, что авторизованному пользователю страница
+    отдаётся без ETag и Last-Modified.
+    """
+    response = author_client.get(url_detail_news)
+    assert 'ETag' not in response.headers
+    assert 'Last-Modified' not in response.headers
+
+
+def test_every_route_has_query_budget(settings):
+    """Проверяем, что для каждого маршрута задан бюджет SQL-запросов."""
+    for pattern in news_urls.urlpatterns:
+        assert f'{news_urls.app_name}:{pattern.name}' in settings.QUERY_BUDGETS
+
+
+@pytest.mark.django_db
+def test_query_budget_exceeded(client, settings, url_home):
+    """Проверяем, что превышение бюджета SQL-запросов роняет запрос."""
+    settings.QUERY_BUDGETS = {**settings.QUERY_BUDGETS, 'news:home': 0}
+    with pytest.raises(QueryBudgetExceeded):
+        client.get(url_home)
+
+
+@pytest.mark.django_db(transaction=True, databases=['default', 'replica'])
+def test_reads_from_replica_until_own_write(
+        settings, author_client, url_home, url_detail_news, form_data
+):
+    """
+    Проверяем, что главная страница и страница новости читаются
+    с реплики, а после отправки комментария пользователь читает
+    с основной базы.
+    """
+    settings.USE_READ_REPLICA = True
+
+    def databases_used(url):
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                author_client.get(url)
+        return bool(primary.captured_queries), bool(replica.captured_queries)
+
+    assert databases_used(url_home) == (False, True)
+    assert databases_used(url_detail_news) == (False, True)
+    author_client.post(url_detail_news, data=form_data)
+    assert Comment.objects.count() == 1
+    assert databases_used(url_home) == (True, False)
+
+
+@pytest.mark.django_db
+def test_server_timing(client, caplog, url_detail_news, comment):
+    """
+    Проверяем, что ответ содержит заголовок Server-Timing с временем
+    запросов к базе, шаблона и всего ответа, а журнал — ту же запись.
+    """
+    with caplog.at_level('INFO', logger='news.middleware'):
+        response = client.get(url_detail_news)
+    metrics = {
+        metric.split(';')[0]: metric
+        for metric in response['Server-Timing'].split(', ')
+    }
+    assert set(metrics) == {'db', 'tpl', 'total'}
+    assert 'queries"' in metrics['db']
+    assert metrics['tpl'] != 'tpl;dur=0.0'
+    record = json.loads(caplog.records[-1].getMessage())
+    assert record['view'] == 'news:detail'
+    assert record['queries'] > 0
+
+
+@pytest.mark.django_db
+def test_metrics(client, url_home):
+    """
+    Проверяем, что /metrics отдаёт гистограммы времени и числа запросов
+    по маршрутам, счётчики ответов и долю попаданий в кэш страниц.
+    """
+    client.get(url_home)
+    client.get(url_home)
+    response = client.get('/metrics')
+    assert response.status_code == HTTPStatus.OK
+    content = response.content.decode()
+    labels = 'method="GET",view="news:home"'
+    assert (
+        f'http_request_duration_seconds_bucket{{{labels},le="+Inf"}}'
+        in content
+    )
+    assert f'http_request_queries_count{{{labels}}}' in content
+    assert (
+        'http_responses_total{method="GET",status="200",view="news:home"}'
+        in content
+    )
+    assert f'http_response_size_bytes_total{{{labels}}}' in content
+    assert 'cache_hit_ratio{cache="news_page"}' in content
+
+
+def test_metrics_sum_processes(settings, tmp_path):
+    """
+    Проверяем, что /metrics складывает счётчики всех процессов,
+    записавших свои файлы в METRICS_DIR.
+    """
+    settings.METRICS_DIR = tmp_path
+    sample = ['cache_requests_total', [['cache', 'other'], ['hit', 'true']]]
+    (tmp_path / '1.json').write_text(json.dumps([[*sample, 3]]))
+    (tmp_path / '2.json').write_text(json.dumps([[*sample, 4]]))
+    content = metrics.render()
+    assert 'cache_requests_total{cache="other",hit="true"} 7' in content
+    assert 'cache_hit_ratio{cache="other"} 1' in content
+    assert (tmp_path / f'{os.getpid()}.json').exists()
+
+
+@pytest.mark.django_db
+def test_metrics_labels_bounded(client):
+    """
+    Проверяем, что произвольный метод и ненайденный адрес
+    не создают новых значений меток.
+    """
+    client.generic('BREW', '/no-such-page-1/')
+    client.generic('FETCH', '/no-such-page-2/')
+    content = client.get('/metrics').content.decode()
+    assert 'BREW' not in content and 'FETCH' not in content
+    assert (
+        'http_responses_total{method="other",status="404",'
+        'view="unresolved"} 2'
+    ) in content
@@ -0,0 +1,109 @@
+import sqlite3
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+PRIMARY = 'default'
+REPLICA = 'replica'
+# Cookie, по которой запросы пользователя после записи читают с основной
+# базы, пока в реплику не скопированы его изменения.
+STICKY_COOKIE = 'read_primary'
+
+read_from_replica = ContextVar('read_from_replica', default=False)
+
+
+class PrimaryReplicaRouter:
+    """
+    Чтение в представлениях из DATABASE_REPLICA_VIEWS идёт с реплики,
+    всё остальное — с основной базы.
+    """
+
+    def db_for_read(self, model, **hints):
+        return REPLICA if read_from_replica.get() else PRIMARY
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        """Реплика получает схему вместе с данными при копировании."""
+        return db == PRIMARY
+
+
+class ReplicaMiddleware:
+    """
+    Направляет чтение GET-запросов к представлениям из
+    DATABASE_REPLICA_VIEWS на реплику.
+
+    После любого запроса, кроме GET и HEAD, пользователь получает cookie
+    на DATABASE_REPLICA_LAG секунд, и до её истечения читает только
+    с основной базы — так он видит свои изменения.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            read_from_replica.set(False)
+        return self.stick_to_primary(request, response)
+
+    async def __acall__(self, request):
+        try:
+            response = await self.get_response(request)
+        finally:
+            read_from_replica.set(False)
+        return self.stick_to_primary(request, response)
+
+    def stick_to_primary(self, request, response):
+        if request.method not in ('GET', 'HEAD'):
+            response.set_cookie(
+                STICKY_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_LAG,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            settings.USE_READ_REPLICA
+            and request.method in ('GET', 'HEAD')
+            and STICKY_COOKIE not in request.COOKIES
+            and request.resolver_match.view_name
+            in settings.DATABASE_REPLICA_VIEWS
+        ):
+            read_from_replica.set(True)
+
+
+def copy_to_replica():
+    """
+    Копирует основную базу SQLite в файл реплики.
+
+    Резервное копирование SQLite переносит согласованный снимок базы,
+    не останавливая запись в неё.
+    """
+    source = sqlite3.connect(connections[PRIMARY].settings_dict['NAME'])
+    target = sqlite3.connect(
+        connections[REPLICA].settings_dict['NAME'],
+        timeout=connections[REPLICA].settings_dict['OPTIONS']['timeout'],
+    )
+    try:
+        with target:
+            source.backup(target)
+    finally:
+        source.close()
+        target.close()
@@ -0,0 +1,111 @@
+from contextvars import ContextVar
+
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .auth import invalidate_user
+from .cache import bump_generation
+from .models import Comment, News
+
+# Новости, комментарии которых удаляются каскадом вместе с самой новостью
+# или автором. Счётчики таких новостей не сдвигаются на каждый
+# комментарий, а пересчитываются одним запросом после удаления.
+cascade_news_ids = ContextVar('cascade_news_ids', default=frozenset())
+
+
+def last_comment_created():
+    """Время последнего комментария к новости из внешнего запроса."""
+    return Subquery(
+        Comment.objects.filter(
+            news=OuterRef('pk')
+        ).order_by('-created').values('created')[:1]
+    )
+
+
+def update_comment_counters(news_id, delta):
+    """
+    Сдвигаем счётчик комментариев новости и обновляем время последнего.
+
+    Счётчик не опускается ниже нуля, даже если он разошёлся
+    с комментариями; точное значение восстанавливает recount_comments.
+    """
+    News.objects.filter(pk=news_id).update(
+        comment_count=Greatest(F('comment_count') + delta, 0),
+        last_comment_at=last_comment_created(),
+    )
+
+
+def recount_comment_counters(news):
+    """Пересчитываем счётчики новостей из news по таблице комментариев."""
+    comment_count = Comment.objects.filter(
+        news=OuterRef('pk')
+    ).order_by().values('news').annotate(
+        count=Count('pk')
+    ).values('count')
+    return news.update(
+        comment_count=Coalesce(Subquery(comment_count), 0),
+        last_comment_at=last_comment_created(),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, raw, **kwargs):
+    if created and not raw:
+        update_comment_counters(instance.news_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    if instance.news_id not in cascade_news_ids.get():
+        update_comment_counters(instance.news_id, -1)
+
+
+@receiver(pre_delete, sender=News)
+def news_deleting(sender, instance, **kwargs):
+    cascade_news_ids.set(cascade_news_ids.get() | {instance.pk})
+
+
+@receiver(post_delete, sender=News)
+def news_deleted(sender, instance, **kwargs):
+    cascade_news_ids.set(cascade_news_ids.get() - {instance.pk})
+
+
+@receiver(pre_delete, sender=get_user_model())
+def user_deleting(sender, instance, **kwargs):
+    """Запоминаем новости, которые комментировал удаляемый пользователь."""
+    instance.commented_news_ids = frozenset(Comment.objects.filter(
+        author=instance
+    ).values_list('news_id', flat=True).distinct())
+    cascade_news_ids.set(cascade_news_ids.get() | instance.commented_news_ids)
+
+
+@receiver(post_delete, sender=get_user_model())
+def user_deleted(sender, instance, **kwargs):
+    """Одним запросом пересчитываем счётчики новостей без его комментариев."""
+    news_ids = getattr(instance, 'commented_news_ids', frozenset())
+    cascade_news_ids.set(cascade_news_ids.get() - news_ids)
+    if news_ids:
+        recount_comment_counters(News.objects.filter(pk__in=news_ids))
+        transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=News)
+@receiver(post_delete, sender=News)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def news_changed(sender, instance, **kwargs):
+    if sender is Comment and instance.news_id in cascade_news_ids.get():
+        return
+    # Поколение сдвигается после фиксации транзакции: иначе запрос,
+    # пришедший до неё, закэшировал бы старые данные под новым поколением.
+    transaction.on_commit(bump_generation)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
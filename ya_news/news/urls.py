@@ -1,12 +1,20 @@
+from django.conf import settings
 from django.urls import path
 
-from news import views
+from news import async_views, views
 
 app_name = 'news'
 
+if settings.NEWS_ASYNC_VIEWS:
+    home_view = async_views.AsyncNewsList.as_view()
+    detail_view = async_views.AsyncNewsDetail.as_view()
+else:
+    home_view = views.NewsList.as_view()
+    detail_view = views.NewsDetailView.as_view()
+
 urlpatterns = [
-    path('', views.NewsList.as_view(), name='home'),
-    path('news/<int:pk>/', views.NewsDetailView.as_view(), name='detail'),
+    path('', home_view, name='home'),
+    path('news/<int:pk>/', detail_view, name='detail'),
     path(
         'delete_comment/<int:pk>/',
         views.CommentDelete.as_view(),
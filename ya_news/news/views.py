@@ -1,38 +1,98 @@
 from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
+from django.utils.decorators import method_decorator
 from django.views import generic
+from django.views.decorators.http import condition
 
+from .cache import AnonymousPageCacheMixin, page_etag, page_last_modified
 from .forms import CommentForm
 from .models import Comment, News
+from .pagination import KeysetPaginator
 
 
-class NewsList(generic.ListView):
+conditional_page = method_decorator(
+    condition(etag_func=page_etag, last_modified_func=page_last_modified),
+    name='dispatch',
+)
+
+
+@conditional_page
+class NewsList(AnonymousPageCacheMixin, generic.ListView):
     """Список новостей."""
     model = News
     template_name = 'news/home.html'
 
+    def get_keyset_paginator(self):
+        """
+        Новости от свежих к старым.
+
+        Число комментариев хранится в самой новости,
+        таблица комментариев не читается.
+        """
+        return KeysetPaginator(
+            self.model.objects.all(),
+            ordering=('-date', '-id'),
+            per_page=settings.NEWS_COUNT_ON_HOME_PAGE,
+        )
+
     def get_queryset(self):
         """
         Выводим только несколько последних новостей.
 
-        Их количество определяется в настройках проекта.
+        Их количество определяется в настройках проекта, более старые
+        новости листаются по курсору (date, id) из параметра cursor.
         """
-        return self.model.objects.prefetch_related(
-            'comment_set'
-        )[:settings.NEWS_COUNT_ON_HOME_PAGE]
+        return self.get_keyset_paginator().get_page(
+            self.request.GET.get('cursor')
+        )
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['next_cursor'] = self.get_keyset_paginator().get_next_cursor(
+            self.object_list
+        )
+        return context
+
+
+class NewsCommentsMixin:
+    """Страница комментариев к новости self.object."""
+
+    def get_keyset_paginator(self):
+        """
+        Комментарии новости от старых к новым.
 
-class NewsDetail(generic.DetailView):
+        Размер страницы определяется в настройках проекта, следующие
+        комментарии листаются по курсору (created, id).
+        """
+        return KeysetPaginator(
+            self.object.comment_set.select_related('author'),
+            ordering=('created', 'id'),
+            per_page=settings.COMMENTS_COUNT_ON_PAGE,
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        paginator = self.get_keyset_paginator()
+        comments = paginator.get_page(self.request.GET.get('cursor'))
+        context['comments'] = comments
+        context['next_cursor'] = paginator.get_next_cursor(comments)
+        return context
+
+
+@conditional_page
+class NewsDetail(
+        AnonymousPageCacheMixin,
+        NewsCommentsMixin,
+        generic.DetailView
+):
     model = News
     template_name = 'news/detail.html'
 
     def get_object(self, queryset=None):
-        obj = get_object_or_404(
-            self.model.objects.prefetch_related('comment_set__author'),
-            pk=self.kwargs['pk']
-        )
+        obj = get_object_or_404(self.model, pk=self.kwargs['pk'])
         return obj
 
     def get_context_data(self, **kwargs):
@@ -44,6 +104,7 @@ class NewsDetail(generic.DetailView):
 
 class NewsComment(
         LoginRequiredMixin,
+        NewsCommentsMixin,
         generic.detail.SingleObjectMixin,
         generic.FormView
 ):
@@ -55,6 +116,7 @@ class NewsComment(
         self.object = self.get_object()
         return super().post(request, *args, **kwargs)
 
+    @transaction.atomic
     def form_valid(self, form):
         comment = form.save(commit=False)
         comment.news = self.object
@@ -63,8 +125,9 @@ class NewsComment(
         return super().form_valid(form)
 
     def get_success_url(self):
-        post = self.get_object()
-        return reverse('news:detail', kwargs={'pk': post.pk}) + '#comments'
+        return reverse(
+            'news:detail', kwargs={'pk': self.object.pk}
+        ) + '#comments'
 
 
 class NewsDetailView(generic.View):
@@ -83,14 +146,15 @@ class CommentBase(LoginRequiredMixin):
     model = Comment
 
     def get_success_url(self):
-        comment = self.get_object()
         return reverse(
-            'news:detail', kwargs={'pk': comment.news.pk}
+            'news:detail', kwargs={'pk': self.object.news_id}
         ) + '#comments'
 
     def get_queryset(self):
         """Пользователь может работать только со своими комментариями."""
-        return self.model.objects.filter(author=self.request.user)
+        return self.model.objects.filter(
+            author=self.request.user
+        ).select_related('news')
 
 
 class CommentUpdate(CommentBase, generic.UpdateView):
@@ -102,3 +166,7 @@ class CommentUpdate(CommentBase, generic.UpdateView):
 class CommentDelete(CommentBase, generic.DeleteView):
     """Удаление комментария."""
     template_name = 'news/delete.html'
+
+    @transaction.atomic
+    def form_valid(self, form):
+        return super().form_valid(form)
@@ -21,6 +21,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'news.middleware.QueryBudgetMiddleware',
+    'news.middleware.ServerTimingMiddleware',
+    'news.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -36,7 +39,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -44,6 +46,14 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Скомпилированные шаблоны хранятся в памяти процесса; при
+            # DEBUG = True изменённые файлы перечитываются автоматически.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -55,9 +65,69 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL не блокирует чтение во время записи; с synchronous=NORMAL
+            # fsync выполняется только при переносе журнала в базу.
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+            ),
+            # Транзакция сразу берёт блокировку записи, поэтому ждёт
+            # её в пределах timeout (busy_timeout, секунды), а не падает
+            # с «database is locked» при попытке начать запись.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        # Под ASGI соединения не переиспользуются между запросами,
+        # там CONN_MAX_AGE стоит вернуть в 0.
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+    }
+}
+
+# Реплика для чтения: копия основной базы, которую обновляет
+# manage.py sync_replica --interval N.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'db.replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['news.routers.PrimaryReplicaRouter']
+
+# Читать ли страницы из DATABASE_REPLICA_VIEWS с реплики.
+USE_READ_REPLICA = False
+DATABASE_REPLICA_VIEWS = {'news:home', 'news:detail'}
+# Сколько секунд после записи пользователь читает с основной базы;
+# должно превышать интервал копирования реплики.
+DATABASE_REPLICA_LAG = 30
+
+# Кэш общий для всех процессов сервера: поколение данных новостей,
+# от которого зависят кэш страниц и ETag, должно меняться сразу во всех.
+# Кэш в памяти процесса (LocMemCache) для этого не подходит.
+# Файловый кэш подходит для одной машины и небольшой нагрузки: каждая
+# запись перебирает файлы каталога, а при MAX_ENTRIES файлах часть их
+# удаляется. В продакшне, где в кэше лежат сессии всех пользователей,
+# нужен Redis:
+# 'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+# 'LOCATION': 'redis://127.0.0.1:6379'.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
+# Сессии читаются из кэша, а пишутся и в кэш, и в базу.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь сессии берётся из кэша.
+AUTHENTICATION_BACKENDS = ['news.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
+
 
 AUTH_PASSWORD_VALIDATORS = []
 
@@ -79,4 +149,31 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('news:home')
 
+# Наибольшее число SQL-запросов на один запрос к маршруту.
+QUERY_BUDGETS = {
+    'news:home': 3,
+    'news:detail': 7,
+    'news:edit': 4,
+    'news:delete': 5,
+}
+# Превышение бюджета поднимает исключение, иначе пишется в журнал.
+QUERY_BUDGET_STRICT = DEBUG
+
+# Каталог, через который процессы gunicorn складывают метрики /metrics;
+# очищайте его при перезапуске. None — только метрики своего процесса.
+METRICS_DIR = None
+# Как часто процесс записывает свои метрики в METRICS_DIR, секунды.
+METRICS_FLUSH_INTERVAL = 1
+
 NEWS_COUNT_ON_HOME_PAGE = 10
+
+COMMENTS_COUNT_ON_PAGE = 50
+
+NEWS_PAGE_CACHE_TIMEOUT = 60 * 15
+
+# Файл с дополнительными запрещёнными словами, по слову в строке.
+NEWS_BAD_WORDS_FILE = None
+
+# Асинхронные варианты главной страницы и страницы новости
+# для запуска под ASGI-сервером (yanews.asgi).
+NEWS_ASYNC_VIEWS = False
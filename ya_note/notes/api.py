@@ -0,0 +1,202 @@
+from http import HTTPStatus
+
+import orjson
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.views import generic
+
+from .cache import invalidate_detail, invalidate_details
+from .forms import NoteForm
+from .models import NoteRevision
+from .revisions import record_title_revisions
+from .views import NoteBase
+
+LIST_FIELDS = ('id', 'slug', 'title')
+DETAIL_FIELDS = ('id', 'slug', 'title', 'text')
+MAX_ID = 2 ** 63 - 1
+
+
+def json_response(data, status=HTTPStatus.OK):
+    return HttpResponse(
+        orjson.dumps(data), status=status, content_type='application/json'
+    )
+
+
+def error_response(errors, status=HTTPStatus.BAD_REQUEST):
+    """Ответ с ошибками: словарь поле → список сообщений."""
+    return json_response({'errors': {
+        field: list(messages) for field, messages in errors.items()
+    }}, status=status)
+
+
+class NoteApiBase(NoteBase, generic.View):
+    """
+    Базовый класс JSON API заметок.
+
+    Права те же, что у HTML-страниц, но анонимный пользователь
+    получает 403 вместо перенаправления на страницу входа.
+    Заметки читаются проекциями .values() без создания моделей.
+    """
+    raise_exception = True
+
+    def get_data(self):
+        """Объект из JSON-тела запроса или None."""
+        try:
+            data = orjson.loads(self.request.body)
+        except orjson.JSONDecodeError:
+            return None
+        return data if isinstance(data, dict) else None
+
+    def get_form(self, instance=None):
+        """Форма с данными из JSON-тела запроса или None."""
+        data = self.get_data()
+        if data is None:
+            return None
+        return NoteForm(data=data, instance=instance)
+
+    def saved(self, note, status=HTTPStatus.OK):
+        return json_response(
+            {field: getattr(note, field) for field in DETAIL_FIELDS},
+            status=status,
+        )
+
+
+class NoteApiList(NoteApiBase):
+    """
+    Список заметок пользователя и создание заметки.
+
+    Список отдаётся страницами по возрастанию id; next — курсор
+    следующей страницы или null на последней.
+    """
+
+    def get(self, request, *args, **kwargs):
+        try:
+            # int() не разбирает строки длиннее 4300 цифр, а SQLite
+            # не принимает числа больше 64-битного id.
+            cursor = int(request.GET.get('cursor', '0'))
+            if not 0 <= cursor <= MAX_ID:
+                raise ValueError
+        except ValueError:
+            return error_response({'cursor': ['Некорректный курсор.']})
+        limit = settings.NOTES_COUNT_ON_PAGE
+        notes = list(self.get_queryset().filter(
+            id__gt=cursor
+        ).order_by('id').values(*LIST_FIELDS)[:limit + 1])
+        next_cursor = None
+        if len(notes) > limit:
+            notes = notes[:limit]
+            next_cursor = str(notes[-1]['id'])
+        return json_response({'results': notes, 'next': next_cursor})
+
+    def post(self, request, *args, **kwargs):
+        form = self.get_form()
+        if form is None:
+            return error_response({'__all__': ['Ожидается объект JSON.']})
+        if not form.is_valid():
+            return error_response(form.errors)
+        form.instance.author = request.user
+        return self.saved(form.save(), status=HTTPStatus.CREATED)
+
+
+class NoteApiDetail(NoteApiBase):
+    """Заметка пользователя: чтение, изменение и удаление."""
+
+    def get(self, request, *args, **kwargs):
+        note = get_object_or_404(
+            self.get_queryset().values(*DETAIL_FIELDS), slug=kwargs['slug']
+        )
+        return json_response(note)
+
+    def put(self, request, *args, **kwargs):
+        note = get_object_or_404(self.get_queryset(), slug=kwargs['slug'])
+        form = self.get_form(instance=note)
+        if form is None:
+            return error_response({'__all__': ['Ожидается объект JSON.']})
+        if not form.is_valid():
+            return error_response(form.errors)
+        note = form.save()
+        invalidate_detail(request.user.pk, kwargs['slug'])
+        return self.saved(note)
+
+    def delete(self, request, *args, **kwargs):
+        deleted, _ = self.get_queryset().filter(slug=kwargs['slug']).delete()
+        if not deleted:
+            return error_response(
+                {'__all__': ['Заметка не найдена.']}, HTTPStatus.NOT_FOUND
+            )
+        invalidate_detail(request.user.pk, kwargs['slug'])
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
+
+
+class NoteApiBulkBase(NoteApiBase):
+    """
+    Базовый класс массовых операций над заметками по списку slug-ов.
+
+    Заметки выбираются одним фильтром по автору и slug-ам, изменение
+    выполняется в транзакции. В ответе — число затронутых заметок;
+    чужие и несуществующие slug-и не считаются. Подклассы задают
+    result_name и perform(notes, **values), возвращающий это число.
+    """
+
+    def post(self, request, *args, **kwargs):
+        data = self.get_data()
+        if data is None:
+            return error_response({'__all__': ['Ожидается объект JSON.']})
+        slugs = data.get('slugs')
+        if (
+            not isinstance(slugs, list)
+            or not all(isinstance(slug, str) for slug in slugs)
+            or len(slugs) > settings.NOTES_BULK_MAX_SLUGS
+        ):
+            return error_response({'slugs': [
+                f'Ожидается список не более чем из '
+                f'{settings.NOTES_BULK_MAX_SLUGS} slug-ов.'
+            ]})
+        try:
+            values = self.clean(data)
+        except ValidationError as error:
+            return error_response(error.message_dict)
+        notes = self.model.objects.filter(
+            author=request.user, slug__in=slugs
+        )
+        with transaction.atomic():
+            affected = self.perform(notes, **values)
+        invalidate_details(request.user.pk, slugs)
+        return json_response({self.result_name: affected})
+
+    def clean(self, data):
+        """Проверенные значения для perform."""
+        return {}
+
+
+class NoteApiBulkDelete(NoteApiBulkBase):
+    """Удаление заметок по списку slug-ов."""
+    result_name = 'deleted'
+
+    def perform(self, notes):
+        # Версии удаляются одним запросом до заметок: связь с ними
+        # каскадная только на стороне Django, и иначе каскад удалял бы
+        # их пачками по заметкам.
+        NoteRevision.objects.filter(note__in=notes).delete()
+        return notes.delete()[1].get(self.model._meta.label, 0)
+
+
+class NoteApiBulkUpdate(NoteApiBulkBase):
+    """Новый заголовок для заметок по списку slug-ов."""
+    result_name = 'updated'
+
+    def clean(self, data):
+        try:
+            title = NoteForm.base_fields['title'].clean(data.get('title'))
+        except ValidationError as error:
+            raise ValidationError({'title': error.messages})
+        return {'title': title}
+
+    def perform(self, notes, title):
+        # Заметки с тем же заголовком не меняются и версий не получают.
+        notes = notes.exclude(title=title)
+        record_title_revisions(notes, title)
+        return notes.update(title=title)
@@ -0,0 +1,85 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+from .metrics import count_cache
+
+
+REPLICA_VERSION_KEY = 'notes:replica_version'
+
+
+def get_replica_version():
+    """
+    Версия копии реплики, входящая в ключи кэша страниц заметок.
+
+    Начальное значение берётся из текущего времени, чтобы после
+    вытеснения ключа из кэша версии не совпали со старыми.
+    """
+    version = cache.get(REPLICA_VERSION_KEY)
+    if version is None:
+        cache.add(REPLICA_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(REPLICA_VERSION_KEY)
+    return version
+
+
+def bump_replica_version():
+    """
+    Реплика обновлена: страницы, отрисованные по старой копии,
+    больше не отдаются из кэша.
+    """
+    cache.set(REPLICA_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def detail_cache_key(author_id, slug, version):
+    return f'notes:detail:{version}:{author_id}:{slug}'
+
+
+def invalidate_detail(author_id, slug):
+    """Удаляем из кэша страницу заметки."""
+    cache.delete(detail_cache_key(author_id, slug, get_replica_version()))
+
+
+def invalidate_details(author_id, slugs):
+    """Удаляем из кэша страницы заметок автора по списку slug-ов."""
+    version = get_replica_version()
+    cache.delete_many([
+        detail_cache_key(author_id, slug, version) for slug in slugs
+    ])
+
+
+class NoteDetailCacheMixin:
+    """
+    Кэш отрисованной страницы заметки по автору и slug.
+
+    Страницу видит только автор, поэтому её можно отдавать из кэша
+    без запроса к базе за заметкой. Страница может быть отрисована
+    по реплике, отстающей от основной базы, поэтому ключ включает
+    версию реплики и после каждого копирования страница строится заново.
+    """
+
+    def get(self, request, *args, **kwargs):
+        key = detail_cache_key(
+            request.user.pk, kwargs['slug'], get_replica_version()
+        )
+        content = cache.get(key)
+        count_cache('notes_detail', content is not None)
+        if content is not None:
+            return HttpResponse(content)
+        response = super().get(request, *args, **kwargs)
+        response.add_post_render_callback(
+            lambda response: cache.set(
+                key, response.content, settings.NOTES_DETAIL_CACHE_TIMEOUT
+            )
+        )
+        return response
+
+
+class NoteDetailInvalidateMixin:
+    """Сбрасываем кэш страницы заметки по slug из адреса."""
+
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        invalidate_detail(self.request.user.pk, self.kwargs['slug'])
+        return response
@@ -0,0 +1,35 @@
+import csv
+import json
+
+# Поля заметки в порядке колонок выгрузки.
+EXPORT_FIELDS = ('slug', 'title', 'text')
+
+
+class Echo:
+    """Файлоподобный объект, который возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_rows(rows):
+    """Строки NDJSON: по одному объекту JSON на заметку."""
+    for row in rows:
+        yield json.dumps(
+            dict(zip(EXPORT_FIELDS, row)), ensure_ascii=False
+        ) + '\n'
+
+
+def csv_rows(rows):
+    """Строки CSV с заголовком из названий полей."""
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+# Формат выгрузки: функция построчной записи, тип содержимого, расширение.
+FORMATS = {
+    'ndjson': (ndjson_rows, 'application/x-ndjson', 'ndjson'),
+    'csv': (csv_rows, 'text/csv', 'csv'),
+}
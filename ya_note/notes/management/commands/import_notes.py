@@ -0,0 +1,178 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, transaction
+
+from notes.forms import WARNING, NoteImportForm
+from notes.models import Note
+from notes.slugs import allocate_slugs
+
+
+def read_ndjson(file):
+    """
+    Строки файла NDJSON. Вместо строки с некорректным JSON выдаётся
+    ошибка разбора: она пропускается при проверке, как строки с ошибками
+    в полях, и не прерывает импорт.
+    """
+    for line in file:
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as error:
+                yield error
+
+
+def read_csv(file):
+    yield from csv.DictReader(file)
+
+
+READERS = {'ndjson': read_ndjson, 'csv': read_csv}
+
+
+def row_error(row):
+    """Ошибка строки, которую нельзя передать в форму, или None."""
+    if isinstance(row, json.JSONDecodeError):
+        return f'некорректный JSON: {row}'
+    if not isinstance(row, dict):
+        return 'ожидается объект с полями title, text и slug'
+    return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает заметки пользователя из файла NDJSON или CSV '
+        'с полями title, text и slug. Заметки сохраняются пачками, '
+        'каждая в своей транзакции; после сбоя импорт продолжается '
+        'с флагом --resume с первой несохранённой пачки.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path, help='Файл с заметками.')
+        parser.add_argument(
+            '--author',
+            required=True,
+            help='Имя пользователя, которому принадлежат заметки.',
+        )
+        parser.add_argument(
+            '--format',
+            dest='file_format',
+            choices=READERS,
+            help='Формат файла; по умолчанию определяется по расширению.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Сколько строк сохранять в одной транзакции.',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Пропустить строки, сохранённые прошлым запуском.',
+        )
+
+    def handle(self, *args, path, author, file_format, chunk_size, resume,
+               **options):
+        try:
+            author = get_user_model().objects.get(username=author)
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Пользователь {author} не найден.')
+        file_format = file_format or path.suffix.lstrip('.')
+        if file_format not in READERS:
+            raise CommandError(
+                f'Неизвестный формат {file_format}, укажите --format.'
+            )
+        read_rows = READERS[file_format]
+        checkpoint = path.with_name(path.name + '.checkpoint')
+        done = 0
+        if resume and checkpoint.exists():
+            done = int(checkpoint.read_text())
+            self.stdout.write(f'Пропущено ранее сохранённых строк: {done}')
+        imported = skipped = 0
+        started = time.monotonic()
+        with path.open(encoding='utf-8', newline='') as file:
+            rows = islice(read_rows(file), done, None)
+            while chunk := list(islice(rows, chunk_size)):
+                try:
+                    with transaction.atomic():
+                        notes = self.validate(chunk, done, author)
+                        Note.objects.bulk_create(notes)
+                except DatabaseError as error:
+                    raise CommandError(
+                        f'Не удалось сохранить строки {done + 1}–'
+                        f'{done + len(chunk)}: {error}. Исправьте ошибку '
+                        f'и запустите команду с --resume.'
+                    ) from error
+                done += len(chunk)
+                checkpoint.write_text(str(done))
+                imported += len(notes)
+                skipped += len(chunk) - len(notes)
+                elapsed = time.monotonic() - started
+                self.stdout.write(
+                    f'Обработано строк: {done}, сохранено заметок: '
+                    f'{imported}, {imported / elapsed:.0f} заметок/с'
+                )
+        checkpoint.unlink(missing_ok=True)
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано заметок: {imported}, пропущено: {skipped}.'
+        ))
+
+    def validate(self, rows, first_row, author):
+        """
+        Заметки из строк, прошедших проверку NoteForm.
+
+        Занятые slug-и ищутся одним запросом на пачку, пустые
+        подбираются из заголовков ещё одним. Строки с ошибками,
+        в том числе не разобранные в объект, пропускаются с сообщением.
+        """
+        forms = [
+            NoteImportForm(data=row) if row_error(row) is None else None
+            for row in rows
+        ]
+        slugs = [
+            form.cleaned_data['slug'] for form in forms
+            if form is not None
+            and form.is_valid() and form.cleaned_data['slug']
+        ]
+        taken = set(Note.objects.filter(
+            slug__in=slugs
+        ).values_list('slug', flat=True))
+        notes = []
+        for number, (row, form) in enumerate(
+            zip(rows, forms), start=first_row + 1
+        ):
+            if form is None:
+                self.stderr.write(
+                    f'Строка {number} пропущена: {row_error(row)}'
+                )
+                continue
+            slug = form.is_valid() and form.cleaned_data['slug']
+            if slug in taken:
+                form.add_error('slug', slug + WARNING)
+            if not form.is_valid():
+                errors = '; '.join(
+                    message for messages in form.errors.values()
+                    for message in messages
+                )
+                self.stderr.write(f'Строка {number} пропущена: {errors}')
+                continue
+            if slug:
+                taken.add(slug)
+            form.instance.author = author
+            notes.append(form.instance)
+        untitled = [note for note in notes if not note.slug]
+        if untitled:
+            max_length = Note._meta.get_field('slug').max_length
+            for note, slug in zip(untitled, allocate_slugs(
+                Note.objects.all(),
+                [note.title for note in untitled],
+                max_length,
+                reserved=taken,
+            )):
+                note.slug = slug
+        return notes
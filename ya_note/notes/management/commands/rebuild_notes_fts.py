@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = (
+        'Перестраивает полнотекстовый индекс заметок notes_note_fts '
+        'по таблице notes_note и сжимает его.'
+    )
+
+    def handle(self, *args, **options):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "INSERT INTO notes_note_fts (notes_note_fts) "
+                "VALUES ('rebuild')"
+            )
+            cursor.execute(
+                "INSERT INTO notes_note_fts (notes_note_fts) "
+                "VALUES ('optimize')"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Полнотекстовый индекс заметок перестроен.'
+        ))
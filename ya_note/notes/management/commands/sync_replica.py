@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notes.cache import bump_replica_version
+from notes.routers import copy_to_replica
+
+
+class Command(BaseCommand):
+    help = (
+        'Копирует основную базу в реплику для чтения. С --interval '
+        'повторяет копирование каждые N секунд.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Пауза между копированиями в секундах; 0 — один раз.',
+        )
+
+    def handle(self, *args, interval, **options):
+        while True:
+            copy_to_replica()
+            bump_replica_version()
+            self.stdout.write('Реплика обновлена.')
+            if not interval:
+                break
+            time.sleep(interval)
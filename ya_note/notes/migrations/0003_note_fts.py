@@ -0,0 +1,57 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:49
+
+from django.db import migrations
+
+# Полнотекстовый индекс FTS5 над title и text заметок. Индекс хранит
+# только словарь: сами тексты читаются из notes_note по rowid = id.
+# Триггеры обновляют индекс при любой вставке, изменении и удалении,
+# в том числе при bulk_create и update/delete по queryset.
+CREATE_FTS = [
+    """
+    CREATE VIRTUAL TABLE notes_note_fts USING fts5(
+        title, text,
+        content='notes_note', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_insert AFTER INSERT ON notes_note BEGIN
+        INSERT INTO notes_note_fts (rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_delete AFTER DELETE ON notes_note BEGIN
+        INSERT INTO notes_note_fts (notes_note_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER notes_note_fts_update AFTER UPDATE OF title, text
+    ON notes_note BEGIN
+        INSERT INTO notes_note_fts (notes_note_fts, rowid, title, text)
+        VALUES ('delete', old.id, old.title, old.text);
+        INSERT INTO notes_note_fts (rowid, title, text)
+        VALUES (new.id, new.title, new.text);
+    END
+    """,
+    "INSERT INTO notes_note_fts (notes_note_fts) VALUES ('rebuild')",
+]
+
+DROP_FTS = [
+    'DROP TRIGGER notes_note_fts_update',
+    'DROP TRIGGER notes_note_fts_delete',
+    'DROP TRIGGER notes_note_fts_insert',
+    'DROP TABLE notes_note_fts',
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0002_note_author_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunSQL(CREATE_FTS, DROP_FTS),
+    ]
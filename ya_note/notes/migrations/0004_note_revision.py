@@ -0,0 +1,30 @@
+# Generated by Django 5.1.1 on 2026-10-18 16:55
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notes', '0003_note_fts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoteRevision',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.PositiveIntegerField(verbose_name='Номер версии')),
+                ('title', models.CharField(max_length=100, verbose_name='Заголовок')),
+                ('snapshot', models.TextField(null=True, verbose_name='Текст целиком')),
+                ('diff', models.JSONField(null=True, verbose_name='Изменения строк')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('note', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='revisions', to='notes.note')),
+            ],
+            options={
+                'ordering': ('number',),
+                'constraints': [models.UniqueConstraint(fields=('note', 'number'), name='note_revision_number_unique')],
+            },
+        ),
+    ]
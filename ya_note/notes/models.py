@@ -1,7 +1,10 @@
 from django.conf import settings
-from django.db import models
+from django.db import IntegrityError, models, transaction
 
-from pytils.translit import slugify
+from .slugs import allocate_slug
+
+# Сколько раз подбирать slug заново, если его успели занять.
+SLUG_ATTEMPTS = 3
 
 
 class Note(models.Model):
@@ -26,13 +29,65 @@ class Note(models.Model):
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.CASCADE,
+        db_index=False,
     )
 
+    class Meta:
+        indexes = (
+            models.Index(fields=('author', 'id'), name='note_author_id_idx'),
+        )
+
     def __str__(self):
         return self.title
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            max_slug_length = self._meta.get_field('slug').max_length
-            self.slug = slugify(self.title)[:max_slug_length]
-        super().save(*args, **kwargs)
+        """
+        Пустой slug подбирается из заголовка.
+
+        Если параллельный запрос занял тот же slug раньше, вставка
+        откатывается до точки сохранения и slug подбирается заново.
+        """
+        if self.slug:
+            return super().save(*args, **kwargs)
+        max_slug_length = self._meta.get_field('slug').max_length
+        others = type(self)._default_manager.exclude(pk=self.pk)
+        for attempt in range(1, SLUG_ATTEMPTS + 1):
+            self.slug = allocate_slug(others, self.title, max_slug_length)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                self.slug = ''
+                if attempt == SLUG_ATTEMPTS:
+                    raise
+
+
+class NoteRevision(models.Model):
+    """
+    Версия заголовка и текста заметки.
+
+    Каждая N-я версия хранит текст целиком (snapshot), остальные —
+    только изменения строк относительно предыдущей версии (diff).
+    """
+    note = models.ForeignKey(
+        Note,
+        on_delete=models.CASCADE,
+        related_name='revisions',
+        db_index=False,
+    )
+    number = models.PositiveIntegerField('Номер версии')
+    title = models.CharField('Заголовок', max_length=100)
+    snapshot = models.TextField('Текст целиком', null=True)
+    diff = models.JSONField('Изменения строк', null=True)
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+
+    class Meta:
+        ordering = ('number',)
+        constraints = (
+            models.UniqueConstraint(
+                fields=('note', 'number'), name='note_revision_number_unique'
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.note_id} #{self.number}'
@@ -0,0 +1,135 @@
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db.models import Max, Q, Subquery
+
+from .models import Note, NoteRevision
+
+
+def make_diff(old, new):
+    """
+    Изменения строк, превращающие текст old в new.
+
+    Список [начало, конец, новые строки]: строки old[начало:конец]
+    заменяются новыми. Размер списка зависит от объёма правки,
+    а не от длины текста.
+    """
+    old_lines = old.splitlines(keepends=True)
+    new_lines = new.splitlines(keepends=True)
+    return [
+        [start, end, new_lines[new_start:new_end]]
+        for tag, start, end, new_start, new_end in SequenceMatcher(
+            None, old_lines, new_lines, autojunk=False
+        ).get_opcodes()
+        if tag != 'equal'
+    ]
+
+
+def apply_diff(text, diff):
+    lines = text.splitlines(keepends=True)
+    for start, end, new_lines in reversed(diff):
+        lines[start:end] = new_lines
+    return ''.join(lines)
+
+
+def needs_snapshot(number, base):
+    """
+    Хранить ли полный текст в версии number.
+
+    base — номер последней версии с полным текстом или None. Отсчёт
+    идёт от сохранённых снимков, поэтому смена
+    NOTES_REVISION_SNAPSHOT_EVERY не ломает уже записанные версии.
+    """
+    return (
+        base is None
+        or number - base >= settings.NOTES_REVISION_SNAPSHOT_EVERY
+    )
+
+
+def reconstruct(note_id, number):
+    """
+    Заголовок и текст версии number заметки или None.
+
+    Читает одним запросом ближайшую версию с полным текстом
+    не позже number и изменения после неё.
+    """
+    base = NoteRevision.objects.filter(
+        note_id=note_id, number__lte=number, snapshot__isnull=False
+    ).order_by('-number').values('number')[:1]
+    revisions = NoteRevision.objects.filter(
+        note_id=note_id,
+        number__gte=Subquery(base),
+        number__lte=number,
+    ).order_by('number').values_list('number', 'title', 'snapshot', 'diff')
+    text = title = None
+    for revision_number, title, snapshot, diff in revisions:
+        text = snapshot if snapshot is not None else apply_diff(text, diff)
+    if text is None or revision_number != number:
+        return None
+    return {'title': title, 'text': text}
+
+
+def record_revision(note, created=False):
+    """
+    Сохраняем версию заметки, если заголовок или текст изменились.
+
+    Первая версия и версия через NOTES_REVISION_SNAPSHOT_EVERY после
+    последнего полного текста хранят текст целиком, остальные —
+    изменения к предыдущей.
+    """
+    number = 1
+    previous = base = None
+    if not created:
+        numbers = note.revisions.aggregate(
+            last=Max('number'),
+            base=Max('number', filter=Q(snapshot__isnull=False)),
+        )
+        if numbers['last'] is not None:
+            number = numbers['last'] + 1
+            base = numbers['base']
+            previous = reconstruct(note.pk, numbers['last'])
+    if previous == {'title': note.title, 'text': note.text}:
+        return None
+    revision = NoteRevision(note=note, number=number, title=note.title)
+    if previous is None or needs_snapshot(number, base):
+        revision.snapshot = note.text
+    else:
+        revision.diff = make_diff(previous['text'], note.text)
+    revision.save()
+    return revision
+
+
+def record_title_revisions(notes, title):
+    """
+    Версии для заметок queryset, которым обновлением сменят заголовок.
+
+    Вызывается до обновления, пока queryset выбирает те же заметки.
+
+    Текст не менялся, поэтому версия хранит пустой список изменений;
+    текст целиком читается только для версий на месте снимка.
+    """
+    last_numbers = notes.values_list('id').annotate(
+        last=Max('revisions__number'),
+        base=Max('revisions__number', filter=Q(
+            revisions__snapshot__isnull=False
+        )),
+    ).order_by()
+    numbers = {}
+    snapshots = []
+    for note_id, last, base in last_numbers:
+        numbers[note_id] = (last or 0) + 1
+        if needs_snapshot(numbers[note_id], base):
+            snapshots.append(note_id)
+    texts = dict(
+        Note.objects.filter(pk__in=snapshots).values_list('id', 'text')
+    ) if snapshots else {}
+    NoteRevision.objects.bulk_create(
+        NoteRevision(
+            note_id=note_id,
+            number=number,
+            title=title,
+            snapshot=texts.get(note_id),
+            diff=None if note_id in texts else [],
+        )
+        for note_id, number in numbers.items()
+    )
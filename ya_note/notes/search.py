@@ -0,0 +1,59 @@
+import re
+
+from django.db import connection
+
+from .models import Note
+
+# Заголовок весит в ранжировании больше текста.
+RANK = 'bm25(notes_note_fts, 10.0, 1.0)'
+# CROSS JOIN закрепляет порядок соединения в SQLite: сначала индекс
+# FTS5 выдаёт совпадения, затем заметки читаются по первичному ключу.
+MATCHES = """
+    FROM notes_note_fts
+    CROSS JOIN notes_note ON notes_note.id = notes_note_fts.rowid
+    WHERE notes_note_fts MATCH %s AND notes_note.author_id = %s
+"""
+
+
+def fts_query(text):
+    """
+    Запрос FTS5 из строки пользователя.
+
+    Каждое слово берётся в кавычки и ищется как префикс, поэтому
+    операторы FTS5 во вводе не влияют на разбор запроса.
+    """
+    return ' '.join(f'"{word}"*' for word in re.findall(r'\w+', text))
+
+
+class NoteSearchResults:
+    """
+    Заметки автора, найденные полнотекстовым поиском.
+
+    Результаты упорядочены по bm25 и поддерживают count() и срезы,
+    поэтому их можно передавать в Paginator.
+    """
+    model = Note
+
+    def __init__(self, author, text):
+        self.author_id = author.pk
+        self.query = fts_query(text)
+
+    def count(self):
+        if not self.query:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) {MATCHES}', [self.query, self.author_id]
+            )
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, item):
+        if not self.query:
+            return []
+        limit = item.stop - item.start
+        return list(Note.objects.raw(
+            f'SELECT notes_note.id, notes_note.title, notes_note.slug, '
+            f'{RANK} AS rank {MATCHES} '
+            f'ORDER BY rank, notes_note.id LIMIT %s OFFSET %s',
+            [self.query, self.author_id, limit, item.start],
+        ))
@@ -0,0 +1,26 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .auth import invalidate_user
+from .cache import invalidate_detail
+from .models import Note
+from .revisions import record_revision
+
+
+@receiver(post_save, sender=Note)
+@receiver(post_delete, sender=Note)
+def note_changed(sender, instance, **kwargs):
+    invalidate_detail(instance.author_id, instance.slug)
+
+
+@receiver(post_save, sender=Note)
+def note_saved(sender, instance, created, raw, **kwargs):
+    if not raw:
+        record_revision(instance, created)
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def user_changed(sender, instance, **kwargs):
+    invalidate_user(instance.pk)
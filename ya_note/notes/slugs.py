@@ -0,0 +1,79 @@
+from itertools import count
+
+from django.db.models import Q
+from pytils.translit import slugify
+
+# Slug для заголовка, из которого транслитерация ничего не оставила.
+DEFAULT_SLUG = 'note'
+# Сколько символов оставлять под суффикс «-N» у длинных slug-ов.
+SUFFIX_RESERVE = 10
+# Сколько различных основ проверять одним запросом.
+BATCH_SIZE = 300
+
+
+def slug_base(text, max_length):
+    return slugify(text)[:max_length] or DEFAULT_SLUG
+
+
+def candidates(base, max_length):
+    """base, затем base-2, base-3… с обрезкой до max_length."""
+    yield base
+    for number in count(2):
+        suffix = f'-{number}'
+        yield base[:max_length - len(suffix)] + suffix
+
+
+def taken_range(base, max_length):
+    """
+    Условие на все занятые slug-и, которые могут совпасть с кандидатами.
+
+    Slug-и из латиницы, цифр, «-» и «_», а «.» следует в ASCII сразу
+    за «-», поэтому диапазон [base, base.) — это base и base-*.
+    У длинной основы суффикс отрезает её конец, и диапазон строится
+    по укороченному началу.
+    """
+    if len(base) + SUFFIX_RESERVE <= max_length:
+        return Q(slug__gte=base, slug__lt=base + '.')
+    stem = base[:max_length - SUFFIX_RESERVE]
+    return Q(slug__gte=stem, slug__lt=stem + '\x7f')
+
+
+def free_slug(base, taken, max_length):
+    for candidate in candidates(base, max_length):
+        if candidate not in taken:
+            return candidate
+
+
+def allocate_slug(queryset, text, max_length):
+    """Свободный в queryset slug для text, найденный одним запросом."""
+    base = slug_base(text, max_length)
+    taken = set(queryset.filter(
+        taken_range(base, max_length)
+    ).values_list('slug', flat=True))
+    return free_slug(base, taken, max_length)
+
+
+def allocate_slugs(queryset, texts, max_length, reserved=()):
+    """
+    Свободные и попарно различные slug-и для списка текстов.
+
+    Один запрос проверяет до BATCH_SIZE различных основ, поэтому число
+    запросов не зависит от числа текстов с одинаковой основой.
+    reserved — slug-и, уже занятые в той же пачке помимо queryset.
+    """
+    bases = [slug_base(text, max_length) for text in texts]
+    unique_bases = list(dict.fromkeys(bases))
+    taken = set(reserved)
+    for start in range(0, len(unique_bases), BATCH_SIZE):
+        condition = Q()
+        for base in unique_bases[start:start + BATCH_SIZE]:
+            condition |= taken_range(base, max_length)
+        taken.update(
+            queryset.filter(condition).values_list('slug', flat=True)
+        )
+    slugs = []
+    for base in bases:
+        slug = free_slug(base, taken, max_length)
+        taken.add(slug)
+        slugs.append(slug)
+    return slugs
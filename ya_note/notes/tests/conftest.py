@@ -0,0 +1,24 @@
+import pytest
+from django.conf import settings
+from django.core.cache import cache
+
+
+def pytest_configure(config):
+    """
+    Тесты работают с кэшем в памяти, а не с файловым кэшем проекта:
+    иначе cache.clear() стирал бы страницы и сессии запущенного сервера.
+    """
+    settings.CACHES = {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }}
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def strict_query_budgets(settings):
+    """Превышение бюджета SQL-запросов маршрута роняет тест."""
+    settings.QUERY_BUDGET_STRICT = True
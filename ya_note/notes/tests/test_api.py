@@ -0,0 +1,179 @@
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from notes.forms import WARNING
+from notes.models import Note, NoteRevision
+
+User = get_user_model()
+
+
+class TestNotesApi(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.not_author = User.objects.create(username='Читатель простой')
+        cls.not_author_client = Client()
+        cls.not_author_client.force_login(cls.not_author)
+        cls.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст',
+            slug='note-slug',
+            author=cls.author)
+        cls.url_list = reverse('notes:api_list')
+        cls.url_detail = reverse('notes:api_detail', args=(cls.note.slug,))
+
+    def send(self, client, method, url, data):
+        return getattr(client, method)(
+            url, json.dumps(data), content_type='application/json'
+        )
+
+    def test_anonymous_user_is_forbidden(self):
+        """Проверяем, что анонимный пользователь получает 403."""
+        for url in (self.url_list, self.url_detail):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    @override_settings(NOTES_COUNT_ON_PAGE=2)
+    def test_list_is_paginated_by_cursor(self):
+        """
+        Проверяем, что список содержит только заметки пользователя
+        и листается курсором до последней страницы.
+        """
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст',
+                 slug=f'note-{index}', author=self.author)
+            for index in range(3)
+        )
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='other', author=self.not_author
+        )
+        slugs = []
+        cursor = '0'
+        while cursor is not None:
+            data = self.author_client.get(
+                self.url_list, {'cursor': cursor}
+            ).json()
+            self.assertLessEqual(len(data['results']), 2)
+            slugs.extend(note['slug'] for note in data['results'])
+            cursor = data['next']
+        self.assertEqual(
+            slugs, ['note-slug', 'note-0', 'note-1', 'note-2']
+        )
+        for cursor in ('x', '²', '-1', str(2 ** 63), '9' * 5000):
+            with self.subTest(cursor=cursor):
+                response = self.author_client.get(
+                    self.url_list, {'cursor': cursor}
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.BAD_REQUEST
+                )
+
+    def test_detail_for_different_users(self):
+        """Проверяем, что заметку видит только её автор."""
+        response = self.author_client.get(self.url_detail)
+        self.assertEqual(response.json(), {
+            'id': self.note.id, 'slug': 'note-slug',
+            'title': 'Заголовок', 'text': 'Текст',
+        })
+        response = self.not_author_client.get(self.url_detail)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_create_uses_note_form(self):
+        """
+        Проверяем, что заметка создаётся с правилами NoteForm:
+        slug подбирается из заголовка и не может повторяться.
+        """
+        response = self.send(self.author_client, 'post', self.url_list, {
+            'title': 'Новая заметка', 'text': 'Текст', 'slug': ''
+        })
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        note = Note.objects.get(slug=response.json()['slug'])
+        self.assertEqual(note.author, self.author)
+        response = self.send(self.author_client, 'post', self.url_list, {
+            'title': 'Повтор', 'text': 'Текст', 'slug': 'note-slug'
+        })
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertEqual(
+            response.json()['errors']['slug'], ['note-slug' + WARNING]
+        )
+
+    def test_update_and_delete_for_different_users(self):
+        """Проверяем, что изменить и удалить заметку может только автор."""
+        data = {'title': 'Новый заголовок', 'text': 'Новый текст',
+                'slug': 'new-slug'}
+        response = self.send(self.not_author_client, 'put',
+                             self.url_detail, data)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.not_author_client.delete(self.url_detail)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.send(self.author_client, 'put', self.url_detail, data)
+        self.assertEqual(response.json()['slug'], 'new-slug')
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.text, 'Новый текст')
+        response = self.author_client.delete(
+            reverse('notes:api_detail', args=('new-slug',))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NO_CONTENT)
+        self.assertFalse(Note.objects.filter(pk=self.note.pk).exists())
+
+    def test_bulk_update_and_delete_only_own_notes(self):
+        """
+        Проверяем, что массовые операции меняют только заметки
+        пользователя и сообщают число затронутых заметок, а заметки
+        с тем же заголовком не получают новых версий.
+        """
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', text='Текст',
+                 slug=f'note-{index}', author=self.author)
+            for index in range(3)
+        )
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='other', author=self.not_author
+        )
+        slugs = ['note-slug', 'note-0', 'note-1', 'other', 'missing']
+        response = self.send(
+            self.author_client, 'post', reverse('notes:api_bulk_update'),
+            {'slugs': slugs, 'title': 'Общий заголовок'}
+        )
+        self.assertEqual(response.json(), {'updated': 3})
+        self.assertEqual(
+            Note.objects.filter(title='Общий заголовок').count(), 3
+        )
+        self.assertEqual(Note.objects.get(slug='other').title, 'Чужая')
+        self.assertEqual(
+            self.note.revisions.order_by('-number').first().title,
+            'Общий заголовок'
+        )
+        revisions = NoteRevision.objects.count()
+        response = self.send(
+            self.author_client, 'post', reverse('notes:api_bulk_update'),
+            {'slugs': slugs, 'title': 'Общий заголовок'}
+        )
+        self.assertEqual(response.json(), {'updated': 0})
+        self.assertEqual(NoteRevision.objects.count(), revisions)
+        response = self.send(
+            self.author_client, 'post', reverse('notes:api_bulk_update'),
+            {'slugs': slugs, 'title': ''}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        response = self.send(
+            self.author_client, 'post', reverse('notes:api_bulk_delete'),
+            {'slugs': slugs}
+        )
+        self.assertEqual(response.json(), {'deleted': 3})
+        self.assertEqual(
+            sorted(Note.objects.values_list('slug', flat=True)),
+            ['note-2', 'other']
+        )
+        response = self.send(
+            self.author_client, 'post', reverse('notes:api_bulk_delete'),
+            {'slugs': 'note-2'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
@@ -1,7 +1,17 @@
+import csv
+import gzip
+import io
+import json
+from unittest import mock
+
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from notes import metrics
 from notes.models import Note
 from notes.forms import NoteForm
 
@@ -53,3 +63,147 @@ class TestContent(TestCase):
                 response = self.author_client.get(url)
                 assert 'form' in response.context
                 assert isinstance(response.context['form'], NoteForm)
+
+    @override_settings(NOTES_COUNT_ON_PAGE=2)
+    def test_notes_list_pages(self):
+        """
+        Проверяем, что список заметок выводится страницами
+        по порядку создания и без загрузки текста заметок.
+        """
+        Note.objects.bulk_create(
+            Note(title=f'Заметка {index}', slug=f'note-{index}',
+                 author=self.author)
+            for index in range(4)
+        )
+        response = self.author_client.get(self.url_list)
+        page = response.context['page_obj']
+        self.assertEqual(page.paginator.num_pages, 3)
+        shown = []
+        for number in page.paginator.page_range:
+            response = self.author_client.get(self.url_list, {'page': number})
+            object_list = list(response.context['object_list'])
+            self.assertLessEqual(len(object_list), 2)
+            for note in object_list:
+                self.assertIn('text', note.get_deferred_fields())
+            shown.extend(note.id for note in object_list)
+        self.assertEqual(shown, sorted(shown))
+        self.assertEqual(
+            shown,
+            list(Note.objects.filter(
+                author=self.author
+            ).values_list('id', flat=True).order_by('id'))
+        )
+
+    def test_search_finds_only_own_notes(self):
+        """
+        Проверяем, что поиск находит заметки по словам заголовка
+        и текста, ставит совпадения в заголовке выше и не показывает
+        заметки другого пользователя.
+        """
+        by_text = Note.objects.create(
+            title='Покупки', text='Купить молоко и хлеб',
+            slug='shopping', author=self.author
+        )
+        by_title = Note.objects.create(
+            title='Молоко', text='Завтра', slug='milk', author=self.author
+        )
+        Note.objects.create(
+            title='Молоко', text='Чужое', slug='other-milk',
+            author=self.not_author
+        )
+        url = reverse('notes:search')
+        response = self.author_client.get(url, {'q': 'молок'})
+        self.assertEqual(
+            list(response.context['object_list']), [by_title, by_text]
+        )
+        response = self.author_client.get(url, {'q': '"OR*'})
+        self.assertEqual(list(response.context['object_list']), [])
+
+    def test_export_contains_only_own_notes(self):
+        """
+        Проверяем, что выгрузка в NDJSON и CSV содержит все заметки
+        пользователя, и только их, в том числе при сжатии gzip.
+        """
+        Note.objects.create(
+            title='Чужая', text='Текст', slug='other', author=self.not_author
+        )
+        expected = [
+            {'slug': 'note-slug', 'title': 'Заголовок', 'text': 'Текст'}
+        ]
+        url = reverse('notes:export')
+        response = self.author_client.get(url)
+        self.assertTrue(response.streaming)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line) for line in lines], expected)
+        response = self.author_client.get(url, {'format': 'csv'})
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(list(csv.DictReader(io.StringIO(content))), expected)
+        response = self.author_client.get(
+            url, {'format': 'csv'}, headers={'Accept-Encoding': 'gzip'}
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)).decode(),
+            content
+        )
+
+    def test_note_detail_is_cached(self):
+        """
+        Проверяем, что страница заметки отдаётся из кэша без запросов
+        к базе, считает попадания и промахи и сбрасывается при
+        изменении и удалении заметки.
+        """
+        def counts():
+            values = metrics.store.snapshot()
+            return [
+                values.get((metrics.CACHE_REQUESTS, (
+                    ('cache', 'notes_detail'), ('hit', hit)
+                )), 0)
+                for hit in ('true', 'false')
+            ]
+
+        url_detail = reverse('notes:detail', args=(self.note.slug,))
+        hits, misses = counts()
+        response = self.author_client.get(url_detail)
+        self.assertContains(response, 'Текст')
+        with self.assertNumQueries(0):
+            response = self.author_client.get(url_detail)
+        self.assertContains(response, 'Текст')
+        self.assertEqual(counts(), [hits + 1, misses + 1])
+        response = self.not_author_client.get(url_detail)
+        self.assertEqual(response.status_code, 404)
+        self.author_client.post(self.url_edit, {
+            'title': 'Заголовок', 'text': 'Новый текст', 'slug': 'moved'
+        })
+        response = self.author_client.get(url_detail)
+        self.assertEqual(response.status_code, 404)
+        url_moved = reverse('notes:detail', args=('moved',))
+        self.assertContains(self.author_client.get(url_moved), 'Новый текст')
+        note = Note.objects.get(slug='moved')
+        note.text = 'Изменён в админке'
+        note.save()
+        self.assertContains(
+            self.author_client.get(url_moved), 'Изменён в админке'
+        )
+        note.delete()
+        response = self.author_client.get(url_moved)
+        self.assertEqual(response.status_code, 404)
+
+    def test_note_detail_cache_reset_on_replica_sync(self):
+        """
+        Проверяем, что после копирования базы в реплику страница
+        заметки не отдаётся из кэша.
+        """
+        url_detail = reverse('notes:detail', args=(self.note.slug,))
+        self.author_client.get(url_detail)
+        with self.assertNumQueries(0):
+            self.author_client.get(url_detail)
+        with mock.patch(
+            'notes.management.commands.sync_replica.copy_to_replica'
+        ) as copy_to_replica:
+            call_command('sync_replica', stdout=io.StringIO())
+        copy_to_replica.assert_called_once_with()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.author_client.get(url_detail)
+        self.assertContains(response, 'Текст')
+        self.assertTrue(queries.captured_queries)
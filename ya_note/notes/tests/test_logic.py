@@ -1,12 +1,26 @@
 from pytils.translit import slugify
 from http import HTTPStatus
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+import json
 
 from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import IntegrityError, connection
+from django.template import engines
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
-from django.test import Client, TestCase
+from django.test import Client, TestCase, override_settings
 
-from notes.models import Note
+from notes.models import Note, NoteRevision
+from notes.revisions import apply_diff, make_diff, reconstruct
 from notes.forms import WARNING
+from notes.search import NoteSearchResults
+from notes.slugs import allocate_slugs
+from yanote.warmup import warmup
 
 
 User = get_user_model()
@@ -64,6 +78,50 @@ class TestCreateLogic(TestCase):
         expected_slug = slugify(self.form_data['title'])
         self.assertEqual(new_note.slug, expected_slug)
 
+    def test_empty_slug_is_made_unique(self):
+        """
+        Проверяем, что если slug из заголовка уже занят,
+        к нему добавляется свободный числовой суффикс.
+        """
+        Note.objects.all().delete()
+        self.form_data.pop('slug')
+        expected_slug = slugify(self.form_data['title'])
+        for suffix in ('', '-2', '-3'):
+            with self.subTest(suffix=suffix):
+                response = self.author_client.post(
+                    self.url_add, data=self.form_data
+                )
+                self.assertRedirects(response, self.url_success)
+                self.assertTrue(
+                    Note.objects.filter(slug=expected_slug + suffix).exists()
+                )
+
+    def test_long_title_slug_fits_field(self):
+        """Проверяем, что суффикс не выводит slug за длину поля."""
+        title = 'а' * 100
+        first = Note.objects.create(title=title, text='1', author=self.author)
+        second = Note.objects.create(title=title, text='2', author=self.author)
+        self.assertEqual(len(first.slug), 100)
+        self.assertEqual(len(second.slug), 100)
+        self.assertTrue(second.slug.endswith('-2'))
+
+    def test_allocate_slugs_in_one_query(self):
+        """
+        Проверяем, что slug-и для пачки заметок подбираются одним
+        запросом и не совпадают ни между собой, ни с занятыми.
+        """
+        Note.objects.create(
+            title='Заметка', text='Текст', author=self.author
+        )
+        titles = ['Заметка', 'Заметка', 'Другая', 'Заметка']
+        with self.assertNumQueries(1):
+            slugs = allocate_slugs(
+                Note.objects.all(), titles, 100, reserved={'zametka-3'}
+            )
+        self.assertEqual(
+            slugs, ['zametka-2', 'zametka-4', 'drugaya', 'zametka-5']
+        )
+
 
 class TestEditDeleteLogic(TestCase):
     @classmethod
@@ -135,3 +193,267 @@ class TestEditDeleteLogic(TestCase):
         response = self.not_author_client.post(self.url_delete)
         self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
         self.assertEqual(Note.objects.count(), note_count_db)
+
+    def test_search_index_follows_changes(self):
+        """
+        Проверяем, что полнотекстовый индекс следует за изменением
+        и удалением заметок и восстанавливается командой rebuild.
+        """
+        def found(word):
+            return [note.id for note in NoteSearchResults(self.author, word)[
+                0:10
+            ]]
+
+        self.assertEqual(found('Текст'), [self.note.id])
+        self.author_client.post(self.url_edit, self.form_data)
+        self.assertEqual(found('Текст'), [self.note.id])
+        self.assertEqual(found('Новый'), [self.note.id])
+        self.assertEqual(found('Заголовок'), [self.note.id])
+        Note.objects.filter(pk=self.note.pk).update(title='Другое')
+        self.assertEqual(found('Новый'), [self.note.id])
+        self.assertEqual(found('Заголовок'), [])
+        with connection.cursor() as cursor:
+            cursor.execute('DELETE FROM notes_note_fts')
+        self.assertEqual(found('Другое'), [])
+        call_command('rebuild_notes_fts', stdout=StringIO())
+        self.assertEqual(found('Другое'), [self.note.id])
+        self.author_client.post(
+            reverse('notes:delete', args=(self.form_data['slug'],))
+        )
+        self.assertEqual(found('Другое'), [])
+
+
+class TestWarmup(TestCase):
+    def test_warmup_compiles_templates(self):
+        """Проверяем, что прогрев кладёт шаблоны страниц в кэш загрузчика."""
+        loader = engines['django'].engine.template_loaders[0]
+        loader.reset()
+        warmup()
+        for name in ('notes/list.html', 'notes/detail.html', 'base.html'):
+            with self.subTest(name=name):
+                self.assertIn(name, loader.get_template_cache)
+
+
+class TestImportNotes(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        Note.objects.create(
+            title='Заголовок', text='Текст', slug='taken', author=cls.author
+        )
+
+    def setUp(self):
+        directory = TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = Path(directory.name) / 'notes.ndjson'
+
+    def write_notes(self, rows):
+        self.path.write_text(
+            ''.join(json.dumps(row) + '\n' for row in rows),
+            encoding='utf-8'
+        )
+
+    def import_notes(self, *args):
+        call_command(
+            'import_notes', self.path, '--author', self.author.username,
+            *args, stdout=StringIO(), stderr=StringIO()
+        )
+
+    def test_import_validates_rows_without_per_row_queries(self):
+        """
+        Проверяем, что импорт пропускает строки с ошибками и занятыми
+        slug-ами, подбирает пустые slug-и и делает одинаковое число
+        запросов независимо от числа строк.
+        """
+        rows = [
+            {'title': f'Заметка {index}', 'text': 'Текст', 'slug': ''}
+            for index in range(100)
+        ] + [
+            {'title': 'Своя', 'text': 'Текст', 'slug': 'own'},
+            {'title': 'Повтор', 'text': 'Текст', 'slug': 'own'},
+            {'title': 'Занятый', 'text': 'Текст', 'slug': 'taken'},
+            {'title': 'Без текста', 'text': '', 'slug': 'no-text'},
+        ]
+        self.write_notes(rows)
+        with CaptureQueriesContext(connection) as queries:
+            self.import_notes()
+        self.assertLessEqual(len(queries), 8)
+        self.assertEqual(Note.objects.count(), 102)
+        self.assertEqual(Note.objects.get(slug='own').title, 'Своя')
+        self.assertTrue(Note.objects.filter(slug='zametka-99').exists())
+        self.assertFalse(Note.objects.filter(slug='no-text').exists())
+
+    def test_import_skips_malformed_lines(self):
+        """
+        Проверяем, что строки с некорректным JSON и не объекты
+        пропускаются с сообщением, а остальные заметки загружаются.
+        """
+        self.path.write_text(
+            '{"title": "Первая", "text": "Текст", "slug": "first"}\n'
+            '{"title": "Оборванная",\n'
+            '[1, 2]\n'
+            '"строка"\n'
+            '{"title": "Последняя", "text": "Текст", "slug": "last"}\n',
+            encoding='utf-8'
+        )
+        stderr = StringIO()
+        call_command(
+            'import_notes', self.path, '--author', self.author.username,
+            '--chunk-size', '2', stdout=StringIO(), stderr=stderr
+        )
+        self.assertEqual(
+            set(Note.objects.values_list('slug', flat=True)),
+            {'taken', 'first', 'last'}
+        )
+        errors = stderr.getvalue()
+        for number in (2, 3, 4):
+            self.assertIn(f'Строка {number} пропущена', errors)
+        self.assertFalse(
+            self.path.with_name(self.path.name + '.checkpoint').exists()
+        )
+
+    def test_import_resumes_after_failed_chunk(self):
+        """
+        Проверяем, что после сбоя пачки сохранённые пачки остаются,
+        а повторный запуск с --resume загружает только остальные.
+        """
+        self.write_notes(
+            {'title': f'Заметка {index}', 'text': 'Текст',
+             'slug': f'note-{index}'}
+            for index in range(5)
+        )
+        bulk_create = Note.objects.bulk_create
+        calls = []
+
+        def fail_second_chunk(notes):
+            calls.append(notes)
+            if len(calls) == 2:
+                raise IntegrityError('сбой')
+            return bulk_create(notes)
+
+        with mock.patch.object(
+            Note.objects, 'bulk_create', side_effect=fail_second_chunk
+        ):
+            with self.assertRaises(CommandError):
+                self.import_notes('--chunk-size', '2')
+        self.assertEqual(
+            set(Note.objects.values_list('slug', flat=True)),
+            {'taken', 'note-0', 'note-1'}
+        )
+        self.import_notes('--chunk-size', '2', '--resume')
+        self.assertEqual(Note.objects.count(), 6)
+        self.assertFalse(
+            self.path.with_name(self.path.name + '.checkpoint').exists()
+        )
+
+
+@override_settings(NOTES_REVISION_SNAPSHOT_EVERY=3)
+class TestRevisions(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create(username='Лев Толстой')
+        cls.author_client = Client()
+        cls.author_client.force_login(cls.author)
+        cls.not_author = User.objects.create(username='Читатель простой')
+        cls.not_author_client = Client()
+        cls.not_author_client.force_login(cls.not_author)
+        cls.texts = [
+            ''.join(f'Строка {line}\n' for line in range(100)),
+        ]
+        for version in range(1, 6):
+            lines = cls.texts[-1].splitlines(keepends=True)
+            lines[version * 10] = f'Правка {version}\n'
+            cls.texts.append(''.join(lines))
+        cls.note = Note.objects.create(
+            title='Заголовок', text=cls.texts[0], slug='note-slug',
+            author=cls.author
+        )
+        for text in cls.texts[1:]:
+            cls.note.text = text
+            cls.note.save()
+
+    def test_diff_round_trip(self):
+        """Проверяем, что изменения строк восстанавливают новый текст."""
+        pairs = (
+            ('', 'а\nб'),
+            ('а\nб\nв', 'а\nв\nг'),
+            ('а\nб\n', ''),
+        )
+        for old, new in pairs:
+            with self.subTest(old=old, new=new):
+                self.assertEqual(apply_diff(old, make_diff(old, new)), new)
+
+    def test_revisions_store_edits_and_snapshots(self):
+        """
+        Проверяем, что полный текст хранит каждая N-я версия, а
+        остальные — только изменённые строки, и что любая версия
+        восстанавливается одним запросом.
+        """
+        revisions = NoteRevision.objects.filter(note=self.note)
+        self.assertEqual(
+            list(revisions.values_list('number', flat=True)),
+            [1, 2, 3, 4, 5, 6]
+        )
+        self.assertEqual(
+            list(revisions.filter(snapshot__isnull=False).values_list(
+                'number', flat=True
+            )),
+            [1, 4]
+        )
+        for revision in revisions.filter(diff__isnull=False):
+            self.assertEqual(len(revision.diff), 1)
+        for number, text in enumerate(self.texts, start=1):
+            with self.subTest(number=number):
+                with self.assertNumQueries(1):
+                    revision = reconstruct(self.note.pk, number)
+                self.assertEqual(revision['text'], text)
+        self.assertIsNone(reconstruct(self.note.pk, 7))
+
+    def test_snapshot_every_change_keeps_revisions(self):
+        """
+        Проверяем, что после смены NOTES_REVISION_SNAPSHOT_EVERY
+        заметка сохраняется, а старые и новые версии восстанавливаются.
+        """
+        texts = list(self.texts)
+        with override_settings(NOTES_REVISION_SNAPSHOT_EVERY=4):
+            for version in range(2):
+                self.note.text = texts[-1] + f'Строка {version}\n'
+                self.note.save()
+                texts.append(self.note.text)
+        self.assertEqual(
+            list(self.note.revisions.filter(
+                snapshot__isnull=False
+            ).values_list('number', flat=True)),
+            [1, 4, 8]
+        )
+        for number, text in enumerate(texts, start=1):
+            with self.subTest(number=number):
+                revision = reconstruct(self.note.pk, number)
+                self.assertEqual(revision['text'], text)
+
+    def test_unchanged_save_adds_no_revision(self):
+        """Проверяем, что сохранение без правок не создаёт версию."""
+        self.note.slug = 'other-slug'
+        self.note.save()
+        self.assertEqual(self.note.revisions.count(), len(self.texts))
+
+    def test_author_can_restore_revision(self):
+        """
+        Проверяем, что автор может вернуть заметку к версии,
+        а другой пользователь — нет.
+        """
+        url = reverse('notes:restore', args=(self.note.slug, 2))
+        response = self.not_author_client.post(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        response = self.author_client.post(url)
+        self.assertRedirects(response, reverse('notes:success'))
+        self.note.refresh_from_db()
+        self.assertEqual(self.note.text, self.texts[1])
+        self.assertEqual(
+            reconstruct(self.note.pk, len(self.texts) + 1)['text'],
+            self.texts[1]
+        )
+        response = self.author_client.post(
+            reverse('notes:restore', args=(self.note.slug, 99))
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
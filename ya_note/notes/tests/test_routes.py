@@ -1,9 +1,17 @@
+import json
 from http import HTTPStatus
 
+from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.test import Client, TestCase
+from django.db import connections
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from notes import urls as notes_urls
+from notes.middleware import QueryBudgetExceeded
 from notes.models import Note
 
 User = get_user_model()
@@ -31,6 +39,9 @@ class TestRoutes(TestCase):
         cls.url_edit = reverse('notes:edit', args=(cls.note.slug,))
         cls.url_delete = reverse('notes:delete', args=(cls.note.slug,))
         cls.url_list = reverse('notes:list')
+        cls.url_history = reverse('notes:history', args=(cls.note.slug,))
+        cls.url_search = reverse('notes:search')
+        cls.url_export = reverse('notes:export')
         cls.url_login = reverse('users:login')
         cls.url_signup = reverse('users:signup')
 
@@ -55,7 +66,9 @@ class TestRoutes(TestCase):
             (self.author_client, HTTPStatus.OK),
             (self.not_author_client, HTTPStatus.NOT_FOUND),
         )
-        urls = (self.url_detail, self.url_edit, self.url_delete)
+        urls = (
+            self.url_detail, self.url_edit, self.url_delete, self.url_history
+        )
         for user, status in users_statuses:
             for url in urls:
                 with self.subTest(user=user, url=url):
@@ -68,7 +81,10 @@ class TestRoutes(TestCase):
         доступны страницы: со списком заметок, успешного
         добавления заметки, добавления новой заметки.
         """
-        urls = (self.url_list, self.url_success, self.url_add)
+        urls = (
+            self.url_list, self.url_success, self.url_add, self.url_search,
+            self.url_export,
+        )
         for url in urls:
             with self.subTest(url=url):
                 response = self.not_author_client.get(url)
@@ -86,10 +102,106 @@ class TestRoutes(TestCase):
             self.url_delete,
             self.url_success,
             self.url_add,
-            self.url_detail
+            self.url_detail,
+            self.url_search,
+            self.url_export,
+            self.url_history,
         )
         for url in urls:
             with self.subTest(url=url):
                 redirect_url = f'{self.url_login}?next={url}'
                 response = self.client.get(url)
                 self.assertRedirects(response, redirect_url)
+
+    def test_every_route_has_query_budget(self):
+        """Проверяем, что для каждого маршрута задан бюджет SQL-запросов."""
+        for pattern in notes_urls.urlpatterns:
+            with self.subTest(name=pattern.name):
+                self.assertIn(
+                    f'{notes_urls.app_name}:{pattern.name}',
+                    settings.QUERY_BUDGETS
+                )
+
+    def test_query_budget_exceeded(self):
+        """Проверяем, что превышение бюджета SQL-запросов роняет запрос."""
+        budgets = {**settings.QUERY_BUDGETS, 'notes:list': 0}
+        with override_settings(
+            QUERY_BUDGETS=budgets, QUERY_BUDGET_STRICT=True
+        ):
+            with self.assertRaises(QueryBudgetExceeded):
+                self.author_client.get(self.url_list)
+
+    def test_server_timing(self):
+        """
+        Проверяем, что ответ содержит заголовок Server-Timing,
+        а журнал — запись с именем маршрута.
+        """
+        with self.assertLogs('notes.middleware', 'INFO') as logs:
+            response = self.author_client.get(self.url_list)
+        self.assertRegex(
+            response['Server-Timing'],
+            r'^db;dur=[\d.]+;desc="\d+ queries", '
+            r'tpl;dur=[\d.]+, total;dur=[\d.]+$'
+        )
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(record['view'], 'notes:list')
+
+    def test_metrics(self):
+        """
+        Проверяем, что /metrics отдаёт гистограммы по маршрутам
+        и долю попаданий в кэш страниц заметок.
+        """
+        self.author_client.get(self.url_detail)
+        self.author_client.get(self.url_detail)
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        content = response.content.decode()
+        self.assertIn(
+            'http_request_duration_seconds_count'
+            '{method="GET",view="notes:detail"}',
+            content
+        )
+        self.assertIn(
+            'http_request_queries_bucket'
+            '{method="GET",view="notes:detail",le="+Inf"}',
+            content
+        )
+        self.assertIn('cache_hit_ratio{cache="notes_detail"}', content)
+        self.assertIn('cache_hit_ratio{cache="auth_user"}', content)
+
+
+@override_settings(USE_READ_REPLICA=True)
+class TestReplicaRoutes(TransactionTestCase):
+    databases = {'default', 'replica'}
+
+    def setUp(self):
+        self.author = User.objects.create(username='Лев Толстой')
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.note = Note.objects.create(
+            title='Заголовок',
+            text='Текст',
+            slug='note-slug',
+            author=self.author)
+
+    def databases_used(self, url):
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                self.author_client.get(url)
+        return bool(primary.captured_queries), bool(replica.captured_queries)
+
+    def test_reads_from_replica_until_own_write(self):
+        """
+        Проверяем, что список заметок и заметка читаются с реплики,
+        а после изменения заметки пользователь читает с основной базы.
+        """
+        url_list = reverse('notes:list')
+        url_detail = reverse('notes:detail', args=(self.note.slug,))
+        self.assertEqual(self.databases_used(url_list), (False, True))
+        self.assertEqual(self.databases_used(url_detail), (False, True))
+        self.assertFalse(self.databases_used(reverse('notes:add'))[1])
+        self.author_client.post(
+            reverse('notes:edit', args=(self.note.slug,)),
+            {'title': 'Новый заголовок', 'text': 'Текст', 'slug': 'new'}
+        )
+        self.assertEqual(self.databases_used(url_list), (True, False))
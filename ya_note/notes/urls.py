@@ -1,6 +1,6 @@
 from django.urls import path
 
-from notes import views
+from notes import api, views
 
 app_name = 'notes'
 
@@ -10,6 +10,30 @@ urlpatterns = [
     path('edit/<slug:slug>/', views.NoteUpdate.as_view(), name='edit'),
     path('note/<slug:slug>/', views.NoteDetail.as_view(), name='detail'),
     path('delete/<slug:slug>/', views.NoteDelete.as_view(), name='delete'),
+    path('history/<slug:slug>/', views.NoteHistory.as_view(), name='history'),
+    path(
+        'restore/<slug:slug>/<int:number>/',
+        views.NoteRestore.as_view(),
+        name='restore'
+    ),
     path('notes/', views.NotesList.as_view(), name='list'),
+    path('search/', views.NotesSearch.as_view(), name='search'),
+    path('export/', views.NoteExport.as_view(), name='export'),
     path('done/', views.NoteSuccess.as_view(), name='success'),
+    path('api/notes/', api.NoteApiList.as_view(), name='api_list'),
+    path(
+        'api/bulk/delete/',
+        api.NoteApiBulkDelete.as_view(),
+        name='api_bulk_delete'
+    ),
+    path(
+        'api/bulk/update/',
+        api.NoteApiBulkUpdate.as_view(),
+        name='api_bulk_update'
+    ),
+    path(
+        'api/notes/<slug:slug>/',
+        api.NoteApiDetail.as_view(),
+        name='api_detail'
+    ),
 ]
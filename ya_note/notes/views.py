@@ -1,9 +1,19 @@
+import re
+
+from django.conf import settings
 from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseRedirect, StreamingHttpResponse
 from django.urls import reverse_lazy
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
 from django.views import generic
 
+from .cache import NoteDetailCacheMixin, NoteDetailInvalidateMixin
+from .export import EXPORT_FIELDS, FORMATS
 from .forms import NoteForm
 from .models import Note
+from .revisions import reconstruct
+from .search import NoteSearchResults
 
 
 class Home(generic.TemplateView):
@@ -32,19 +42,17 @@ class NoteCreate(NoteBase, generic.CreateView):
     form_class = NoteForm
 
     def form_valid(self, form):
-        new_note = form.save(commit=False)
-        new_note.author = self.request.user
-        new_note.save()
+        form.instance.author = self.request.user
         return super().form_valid(form)
 
 
-class NoteUpdate(NoteBase, generic.UpdateView):
+class NoteUpdate(NoteDetailInvalidateMixin, NoteBase, generic.UpdateView):
     """Редактирование заметки."""
     template_name = 'notes/form.html'
     form_class = NoteForm
 
 
-class NoteDelete(NoteBase, generic.DeleteView):
+class NoteDelete(NoteDetailInvalidateMixin, NoteBase, generic.DeleteView):
     """Удаление заметки."""
     template_name = 'notes/delete.html'
 
@@ -53,7 +61,100 @@ class NotesList(NoteBase, generic.ListView):
     """Список всех заметок пользователя."""
     template_name = 'notes/list.html'
 
+    def get_paginate_by(self, queryset):
+        """Количество заметок на странице определяется в настройках."""
+        return settings.NOTES_COUNT_ON_PAGE
+
+    def get_queryset(self):
+        """Заметки по порядку создания, без текста."""
+        return super().get_queryset().only(
+            'id', 'slug', 'title'
+        ).order_by('id')
 
-class NoteDetail(NoteBase, generic.DetailView):
+
+class NoteDetail(NoteDetailCacheMixin, NoteBase, generic.DetailView):
     """Заметка подробно."""
     template_name = 'notes/detail.html'
+
+
+class NotesSearch(NoteBase, generic.ListView):
+    """Полнотекстовый поиск по заметкам пользователя."""
+    template_name = 'notes/search.html'
+
+    def get_paginate_by(self, queryset):
+        """Количество заметок на странице определяется в настройках."""
+        return settings.NOTES_COUNT_ON_PAGE
+
+    def get_queryset(self):
+        """Заметки пользователя, подходящие под запрос q, по релевантности."""
+        return NoteSearchResults(
+            self.request.user, self.request.GET.get('q', '')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['query'] = self.request.GET.get('q', '')
+        return context
+
+
+class NoteExport(NoteBase, generic.View):
+    """
+    Выгрузка всех заметок пользователя в NDJSON или CSV.
+
+    Заметки читаются из базы частями и сразу отдаются клиенту,
+    поэтому память не зависит от их количества. Если клиент
+    принимает gzip, выгрузка сжимается на лету.
+    """
+    accepts_gzip = re.compile(r'\bgzip\b')
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('format', 'ndjson')
+        if export_format not in FORMATS:
+            raise Http404('Неизвестный формат выгрузки.')
+        write_rows, content_type, extension = FORMATS[export_format]
+        rows = self.get_queryset().order_by('id').values_list(
+            *EXPORT_FIELDS
+        ).iterator(chunk_size=settings.NOTES_EXPORT_CHUNK_SIZE)
+        content = (line.encode() for line in write_rows(rows))
+        gzipped = self.accepts_gzip.search(
+            request.headers.get('Accept-Encoding', '')
+        )
+        if gzipped:
+            content = compress_sequence(content)
+        response = StreamingHttpResponse(
+            content, content_type=f'{content_type}; charset=utf-8'
+        )
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ('Accept-Encoding',))
+        response.headers['Content-Disposition'] = (
+            f'attachment; filename="notes.{extension}"'
+        )
+        return response
+
+
+class NoteHistory(NoteBase, generic.DetailView):
+    """Версии заметки, от последней к первой."""
+    template_name = 'notes/history.html'
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['revisions'] = self.object.revisions.order_by(
+            '-number'
+        ).values('number', 'title', 'created')
+        return context
+
+
+class NoteRestore(NoteBase, generic.detail.SingleObjectMixin, generic.View):
+    """Возврат заметки к версии; возврат сохраняется новой версией."""
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        note = self.get_object()
+        revision = reconstruct(note.pk, kwargs['number'])
+        if revision is None:
+            raise Http404('Такой версии заметки нет.')
+        note.title = revision['title']
+        note.text = revision['text']
+        note.save()
+        return HttpResponseRedirect(self.success_url)
@@ -11,6 +11,10 @@ import os
 
 from django.core.asgi import get_asgi_application
 
+from yanote.warmup import warmup
+
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yanote.settings')
 
 application = get_asgi_application()
+
+warmup()
@@ -22,6 +22,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'notes.middleware.QueryBudgetMiddleware',
+    'notes.middleware.ServerTimingMiddleware',
+    'notes.routers.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -37,7 +40,6 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -45,6 +47,14 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            # Скомпилированные шаблоны хранятся в памяти процесса; при
+            # DEBUG = True изменённые файлы перечитываются автоматически.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
         },
     },
 ]
@@ -56,9 +66,67 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            # WAL не блокирует чтение во время записи; с synchronous=NORMAL
+            # fsync выполняется только при переносе журнала в базу.
+            'init_command': (
+                'PRAGMA journal_mode=WAL;'
+                'PRAGMA synchronous=NORMAL;'
+                'PRAGMA mmap_size=134217728;'
+                'PRAGMA cache_size=-20000;'
+            ),
+            # Транзакция сразу берёт блокировку записи, поэтому ждёт
+            # её в пределах timeout (busy_timeout, секунды), а не падает
+            # с «database is locked» при попытке начать запись.
+            'transaction_mode': 'IMMEDIATE',
+            'timeout': 20,
+        },
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
+# Реплика для чтения: копия основной базы, которую обновляет
+# manage.py sync_replica --interval N.
+DATABASES['replica'] = {
+    **DATABASES['default'],
+    'NAME': BASE_DIR / 'db.replica.sqlite3',
+    'TEST': {'MIRROR': 'default'},
+}
+
+DATABASE_ROUTERS = ['notes.routers.PrimaryReplicaRouter']
+
+# Читать ли страницы из DATABASE_REPLICA_VIEWS с реплики.
+USE_READ_REPLICA = False
+DATABASE_REPLICA_VIEWS = {'notes:list', 'notes:detail'}
+# Сколько секунд после записи пользователь читает с основной базы;
+# должно превышать интервал копирования реплики.
+DATABASE_REPLICA_LAG = 30
+
+# Кэш общий для всех процессов сервера, чтобы сброс страницы заметки
+# после правки был виден сразу во всех; кэш в памяти процесса
+# (LocMemCache) для этого не подходит.
+# Файловый кэш подходит для одной машины и небольшой нагрузки: каждая
+# запись перебирает файлы каталога, а при MAX_ENTRIES файлах часть их
+# удаляется. В продакшне, где в кэше лежат сессии всех пользователей,
+# нужен Redis:
+# 'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+# 'LOCATION': 'redis://127.0.0.1:6379'.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / '.cache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Сессии читаются из кэша, а пишутся и в кэш, и в базу.
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+
+# Пользователь сессии берётся из кэша.
+AUTHENTICATION_BACKENDS = ['notes.auth.CachedModelBackend']
+AUTH_USER_CACHE_TIMEOUT = 60 * 15
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -87,3 +155,46 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 LOGIN_URL = reverse_lazy('users:login')
 LOGIN_REDIRECT_URL = reverse_lazy('notes:home')
+
+NOTES_COUNT_ON_PAGE = 50
+
+NOTES_DETAIL_CACHE_TIMEOUT = 60 * 15
+
+# Сколько заметок читать из базы за раз при выгрузке.
+NOTES_EXPORT_CHUNK_SIZE = 2000
+
+# Наибольшее число заметок в одной массовой операции.
+NOTES_BULK_MAX_SLUGS = 1000
+
+# Каждая N-я версия заметки хранит текст целиком, остальные — изменения.
+NOTES_REVISION_SNAPSHOT_EVERY = 20
+
+# Наибольшее число SQL-запросов на один запрос к маршруту.
+QUERY_BUDGETS = {
+    'notes:home': 2,
+    'notes:add': 7,
+    'notes:edit': 8,
+    'notes:detail': 3,
+    'notes:delete': 5,
+    'notes:history': 4,
+    'notes:restore': 8,
+    'notes:list': 4,
+    'notes:search': 4,
+    'notes:export': 2,
+    'notes:api_list': 7,
+    'notes:api_detail': 8,
+    # QuerySet.delete() удаляет заметки пачками, чтобы отправить
+    # post_delete; при NOTES_BULK_MAX_SLUGS заметок это 15 запросов.
+    'notes:api_bulk_delete': 16,
+    # Версии вставляются пачками по ограничению SQLite на число параметров.
+    'notes:api_bulk_update': 14,
+    'notes:success': 2,
+}
+# Превышение бюджета поднимает исключение, иначе пишется в журнал.
+QUERY_BUDGET_STRICT = DEBUG
+
+# Каталог, через который процессы gunicorn складывают метрики /metrics;
+# очищайте его при перезапуске. None — только метрики своего процесса.
+METRICS_DIR = None
+# Как часто процесс записывает свои метрики в METRICS_DIR, секунды.
+METRICS_FLUSH_INTERVAL = 1